@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+# Headless benchmarks for the SoftCam.Key and biss.txt hot paths.
+#
+#   python benchmarks/bench_hotpaths.py                 # full run
+#   python benchmarks/bench_hotpaths.py --quick --json out.json
+#   python benchmarks/bench_hotpaths.py --baseline out.json --tolerance 2.0
+#
+# plugin.py is imported against the stubs in benchmarks/stubs, so the same
+# code that ships to the box is measured here.
+import argparse, importlib, importlib.util, json, os, re, shutil, sys, tempfile, time, tracemalloc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+sys.path.insert(0, HERE)
+from synth import softcam_key, biss_txt
+
+KEY_SIZES = (1000, 10000, 50000, 200000)
+BISS_SIZES = (100 * 1024, 1024 * 1024, 5 * 1024 * 1024)
+QUICK_KEY_SIZES = (1000, 10000)
+QUICK_BISS_SIZES = (100 * 1024, 1024 * 1024)
+
+def load_plugin():
+    sys.path.insert(0, os.path.join(HERE, "stubs"))
+    spec = importlib.util.spec_from_file_location("BissPro", os.path.join(ROOT, "__init__.py"), submodule_search_locations=[ROOT])
+    pkg = importlib.util.module_from_spec(spec); sys.modules["BissPro"] = pkg; spec.loader.exec_module(pkg)
+    return importlib.import_module("BissPro.plugin")
+
+class Session(object):
+    class nav(object):
+        @staticmethod
+        def getCurrentService(): return None
+    def open(self, *args, **kwargs): pass
+    def openWithCallback(self, *args, **kwargs): pass
+
+def measure(fn, repeat):
+    times = []
+    for i in range(repeat):
+        t = time.perf_counter(); fn(i); times.append(time.perf_counter() - t)
+    tracemalloc.start(); base = tracemalloc.get_traced_memory()[0]
+    fn(repeat)
+    peak = tracemalloc.get_traced_memory()[1] - base; tracemalloc.stop()
+    times.sort()
+    return {"ms": round(times[len(times) // 2] * 1000, 3), "peak_kb": round(max(0, peak) / 1024.0, 1)}
+
+def resident(path):
+    # What a loaded store keeps between calls, reported in the peak column.
+    from BissPro.keystore import KeyStore
+    tracemalloc.start(); base = tracemalloc.get_traced_memory()[0]
+    t = time.perf_counter(); store = KeyStore(path); store.refresh(); ms = time.perf_counter() - t
+    kept = tracemalloc.get_traced_memory()[0] - base; tracemalloc.stop()
+    return {"ms": round(ms * 1000, 3), "peak_kb": round(max(0, kept) / 1024.0, 1)}
+
+# ==========================================================
+# SoftCam.Key
+# ==========================================================
+def bench_keys(plugin, lines, workdir, repeat):
+    from BissPro.keystore import KeyStore, get_store
+    path = os.path.join(workdir, f"SoftCam{lines}.Key")
+    with open(path, "w") as f: f.write(softcam_key(lines))
+    plugin.get_softcam_path = lambda: path
+    res = {}
+    res["parse"] = measure(lambda i: KeyStore(path).refresh(), repeat)
+    res["resident"] = resident(path)
+    store = get_store(path); store.refresh()
+    res["save_new"] = measure(lambda i: plugin.BISSPro.save_biss_key(None, "%08X" % (0xEE000000 + i), "0123456789ABCDEF", "Bench New"), repeat)
+    res["save_existing"] = measure(lambda i: plugin.BISSPro.save_biss_key(None, "%08X" % 0xEE000000, "%016X" % i, "Bench New"), repeat)
+    screen = plugin.BissManagerList(Session())
+    def load(i):
+        screen.rows = []; screen.view = []; res = screen.read_keys(path, screen.load_id)
+        plugin.executor.drain(limit=lines); screen.keys_loaded(res)
+    res["editor_load"] = measure(load, repeat)
+    # The writes run on the executor on the box; here the job and its callback run inline.
+    def edit(i):
+        screen["keylist"].moveToIndex(i % 10)
+        sel, entry = screen.selected()
+        screen.edit_done(entry, sel, screen.write_edit(path, entry, "%016X" % (i + 1)))
+    res["editor_edit"] = measure(edit, repeat)
+    def delete(i):
+        screen["keylist"].moveToIndex(0); sel, entry = screen.selected()
+        screen.delete_done(entry, sel, screen.write_delete(path, entry))
+    res["editor_delete"] = measure(delete, repeat)
+    res["filter"] = measure(lambda i: (screen.clear_filter(), screen.filter_done("FEED CHANNEL 9")), repeat)
+    return res
+
+# ==========================================================
+# biss.txt
+# ==========================================================
+LEGACY_RE = r'.*?(([0-9A-Fa-f]{2}[\s\t]*){8})'
+
+def bench_biss(plugin, size, workdir, repeat):
+    from BissPro.bissindex import BissIndex, parse_biss
+    text = biss_txt(size)
+    last = re.findall(r"^(\d{4,5}) ", text, re.M)[-1]
+    res = {}
+    res["parse"] = measure(lambda i: parse_biss(text), repeat)
+    index = BissIndex(path=os.path.join(workdir, "biss.idx.json")); index._data = {"index": parse_biss(text), "checked": time.time()}
+    res["lookup_x1000"] = measure(lambda i: [index.lookup(10700 + n % 2050, "HV"[n % 2], 7200, "Feed") for n in range(1000)], repeat)
+    # The pre-index Auto Search: a lazy re.S scan from the first frequency hit.
+    res["legacy_regex"] = measure(lambda i: re.search(re.escape(last) + LEGACY_RE, text, re.I | re.S), repeat)
+    return res
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="BissPro hot path benchmarks")
+    ap.add_argument("--quick", action="store_true", help="smaller inputs, for CI")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--json", help="write results to this file")
+    ap.add_argument("--baseline", help="fail when an operation is slower than this earlier --json result")
+    ap.add_argument("--tolerance", type=float, default=2.0)
+    args = ap.parse_args(argv)
+    plugin = load_plugin()
+    from BissPro import fetch
+    from BissPro.softcam import reloader
+    reloader.schedule = lambda: None
+    workdir = tempfile.mkdtemp(prefix="bisspro-bench-"); fetch.CACHE_DIR = workdir
+    results = {}
+    try:
+        for lines in (QUICK_KEY_SIZES if args.quick else KEY_SIZES):
+            for op, r in bench_keys(plugin, lines, workdir, args.repeat).items(): results[f"softcam.{op}[{lines}]"] = r
+        for size in (QUICK_BISS_SIZES if args.quick else BISS_SIZES):
+            for op, r in bench_biss(plugin, size, workdir, args.repeat).items(): results[f"biss.{op}[{size // 1024}k]"] = r
+    finally: shutil.rmtree(workdir, True)
+    width = max(len(k) for k in results)
+    print(f"{'operation':<{width}}  {'ms':>10}  {'peak KiB':>10}")
+    for k, r in results.items(): print(f"{k:<{width}}  {r['ms']:>10.3f}  {r['peak_kb']:>10.1f}")
+    if args.json:
+        with open(args.json, "w") as f: json.dump(results, f, indent=1, sort_keys=True)
+    if args.baseline:
+        with open(args.baseline) as f: base = json.load(f)
+        slow = [k for k, r in results.items() if k in base and r["ms"] > max(base[k]["ms"] * args.tolerance, base[k]["ms"] + 1.0)]
+        for k in slow: print(f"REGRESSION {k}: {results[k]['ms']} ms vs {base[k]['ms']} ms")
+        return 1 if slow else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
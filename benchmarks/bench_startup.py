@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+# Startup benchmarks: plugin import cost and time to first frame per screen.
+#
+#   python benchmarks/bench_startup.py
+#   python benchmarks/bench_startup.py --json startup.json
+#
+# The import is timed in fresh interpreters, so nothing a previous run
+# loaded is counted as free. Screens are timed from construction through
+# onLayoutFinish, once with empty skin/menu caches ("first") and once warm.
+import argparse, json, os, shutil, subprocess, sys, tempfile, time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+from bench_hotpaths import load_plugin, Session
+
+# Modules that should only be imported once a network job actually runs.
+HEAVY = ("urllib.request", "http.client", "email.message", "ssl", "gzip", "hashlib")
+
+IMPORT_PROBE = """
+import sys, time, json
+sys.path.insert(0, %r)
+from bench_hotpaths import load_plugin
+before = set(sys.modules); t = time.perf_counter(); load_plugin(); ms = (time.perf_counter() - t) * 1000
+print(json.dumps({"ms": ms, "modules": sorted(set(sys.modules) - before)}))
+"""
+
+def bench_import(runs):
+    times = []; loaded = []
+    for i in range(runs):
+        out = subprocess.check_output([sys.executable, "-c", IMPORT_PROBE % HERE])
+        res = json.loads(out.decode("utf-8").strip().splitlines()[-1]); times.append(res["ms"]); loaded = res["modules"]
+    times.sort()
+    return {"ms": round(times[len(times) // 2], 3), "modules": len(loaded), "heavy": [m for m in HEAVY if m in loaded]}
+
+def timed(fn, repeat):
+    times = []
+    for i in range(repeat):
+        t = time.perf_counter(); fn(); times.append(time.perf_counter() - t)
+    times.sort()
+    return round(times[len(times) // 2] * 1000, 3)
+
+def bench_screens(plugin, repeat):
+    def open_screen(cls, *args):
+        def run():
+            screen = cls(Session(), *args); screen.layoutFinished(); screen.close()
+        return run
+    screens = [("BISSPro", open_screen(plugin.BISSPro)), ("BissManagerList", open_screen(plugin.BissManagerList)),
+               ("HexInputScreen", open_screen(plugin.HexInputScreen, "Bench Feed", "0123456789ABCDEF")), ("DiagnosticsScreen", open_screen(plugin.DiagnosticsScreen))]
+    res = {}
+    for name, run in screens:
+        def cold():
+            plugin._skins.clear(); plugin._menus.clear(); run()
+        res[f"screen.{name}.first"] = timed(cold, repeat)
+        res[f"screen.{name}.warm"] = timed(run, repeat)
+    hexin = plugin.HexInputScreen(Session(), "Bench Feed")
+    def typing():
+        for i in range(100):
+            hexin.keyNum(str(i % 10)); hexin.move_char_down(); hexin.move_left()
+    res["hex.keys_x300"] = timed(typing, repeat)
+    return res
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="BissPro startup benchmarks")
+    ap.add_argument("--repeat", type=int, default=20)
+    ap.add_argument("--runs", type=int, default=5, help="fresh interpreters for the import timing")
+    ap.add_argument("--json", help="write results to this file")
+    args = ap.parse_args(argv)
+    imp = bench_import(args.runs)
+    plugin = load_plugin()
+    from BissPro import fetch, selfupdate
+    workdir = tempfile.mkdtemp(prefix="bisspro-bench-"); fetch.CACHE_DIR = workdir
+    # A fresh version check on record, so opening the main screen never goes to the network.
+    fetch.save_json(fetch.cache_file(selfupdate.STATE_FILE), {"checked": int(time.time())})
+    key_path = os.path.join(workdir, "SoftCam.Key")
+    with open(key_path, "w") as f: f.write("F 00010100 00000000 0123456789ABCDEF ;Bench Feed\n")
+    plugin.get_softcam_path = lambda: key_path
+    try: results = bench_screens(plugin, args.repeat)
+    finally: shutil.rmtree(workdir, True)
+    print(f"plugin import: {imp['ms']:.3f} ms, {imp['modules']} modules, heavy: {', '.join(imp['heavy']) or 'none'}")
+    width = max(len(k) for k in results)
+    print(f"{'operation':<{width}}  {'ms':>10}")
+    for k, ms in results.items(): print(f"{k:<{width}}  {ms:>10.3f}")
+    if args.json:
+        results["import"] = imp
+        with open(args.json, "w") as f: json.dump(results, f, indent=1, sort_keys=True)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,4 @@
+# -*- coding: utf-8 -*-
+class ActionMap(object):
+    def __init__(self, contexts, actions=None, prio=0):
+        self.contexts = contexts; self.actions = actions or {}
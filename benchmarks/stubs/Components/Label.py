@@ -0,0 +1,5 @@
+# -*- coding: utf-8 -*-
+class Label(object):
+    def __init__(self, text=""): self.text = text
+    def setText(self, text): self.text = text
+    def getText(self): return self.text
@@ -0,0 +1,14 @@
+# -*- coding: utf-8 -*-
+class _Content(object):
+    def __init__(self): self.list = []; self.invalidated = []
+    def setList(self, lst): self.list = lst
+    def setFont(self, n, font): pass
+    def invalidateEntry(self, index): self.invalidated.append(index)
+
+class MenuList(object):
+    def __init__(self, list, enableWrapAround=False, content=None):
+        self.l = _Content(); self.index = 0; self.setList(list)
+    def setList(self, lst): self.list = lst; self.l.setList(lst); self.index = 0
+    def getCurrent(self): return self.list[self.index] if 0 <= self.index < len(self.list) else None
+    def getSelectionIndex(self): return self.index
+    def moveToIndex(self, index): self.index = index
@@ -0,0 +1,6 @@
+# -*- coding: utf-8 -*-
+def MultiContentEntryText(pos=(0, 0), size=(0, 0), font=0, flags=0, text="", color=None, **kwargs):
+    return (0, pos[0], pos[1], size[0], size[1], font, flags, text, color)
+
+def MultiContentEntryPixmapAlphaTest(pos=(0, 0), size=(0, 0), png=None, **kwargs):
+    return (1, pos[0], pos[1], size[0], size[1], png)
@@ -0,0 +1,4 @@
+# -*- coding: utf-8 -*-
+class ProgressBar(object):
+    def __init__(self): self.value = 0
+    def setValue(self, value): self.value = value
@@ -0,0 +1,10 @@
+# -*- coding: utf-8 -*-
+class ConfigSubsection(object):
+    pass
+
+class ConfigYesNo(object):
+    def __init__(self, default=False): self.value = default
+    def save(self): pass
+
+config = ConfigSubsection()
+config.plugins = ConfigSubsection()
@@ -0,0 +1,5 @@
+# -*- coding: utf-8 -*-
+class PluginDescriptor(object):
+    WHERE_PLUGINMENU, WHERE_EXTENSIONSMENU, WHERE_SESSIONSTART, WHERE_AUTOSTART = 0, 1, 2, 3
+    def __init__(self, name="", description="", where=None, icon=None, fnc=None, **kwargs):
+        self.name = name; self.description = description; self.where = where; self.icon = icon; self.fnc = fnc
@@ -0,0 +1,6 @@
+# -*- coding: utf-8 -*-
+from Screens.Screen import Screen
+
+class ChoiceBox(Screen):
+    def __init__(self, session, title="", list=None, **kwargs):
+        Screen.__init__(self, session); self.list = list or []
@@ -0,0 +1,7 @@
+# -*- coding: utf-8 -*-
+from Screens.Screen import Screen
+
+class MessageBox(Screen):
+    TYPE_YESNO, TYPE_INFO, TYPE_WARNING, TYPE_ERROR = 0, 1, 2, 3
+    def __init__(self, session, text, type=TYPE_YESNO, timeout=-1, **kwargs):
+        Screen.__init__(self, session); self.text = text; self.type = type
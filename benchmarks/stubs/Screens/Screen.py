@@ -0,0 +1,10 @@
+# -*- coding: utf-8 -*-
+class Screen(dict):
+    def __init__(self, session, parent=None):
+        dict.__init__(self)
+        self.session = session; self.onLayoutFinish = []; self.onClose = []; self.onShown = []
+    def layoutFinished(self):
+        for f in self.onLayoutFinish: f()
+    def close(self, *retval):
+        for f in self.onClose: f()
+        self.retval = retval
@@ -0,0 +1,6 @@
+# -*- coding: utf-8 -*-
+from Screens.Screen import Screen
+
+class VirtualKeyBoard(Screen):
+    def __init__(self, session, title="", text="", **kwargs):
+        Screen.__init__(self, session); self.text = text
@@ -0,0 +1,3 @@
+# -*- coding: utf-8 -*-
+def LoadPixmap(path=None, cached=False, **kwargs):
+    return path
@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+# Minimal stand-in for the enigma2 C++ module, enough to import plugin.py off-box.
+RT_HALIGN_LEFT, RT_HALIGN_RIGHT, RT_HALIGN_CENTER, RT_VALIGN_TOP, RT_VALIGN_CENTER = 0, 1, 2, 0, 8
+
+class iServiceInformation(object):
+    sIsCrypted, sVideoPID, sSID, sTransponderData = 0, 1, 4, 100
+
+class iPlayableService(object):
+    evStart, evEnd, evTunedIn, evUpdatedInfo = 0, 1, 2, 5
+
+class gFont(object):
+    def __init__(self, face, size): self.face = face; self.size = size
+
+class eTimer(object):
+    def __init__(self): self.callback = []; self.active = False
+    def start(self, ms, single=False): self.active = True
+    def stop(self): self.active = False
+    def fire(self):
+        for cb in list(self.callback): cb()
+
+class eSize(object):
+    def __init__(self, w, h): self.w = w; self.h = h
+    def width(self): return self.w
+    def height(self): return self.h
+
+class _Desktop(object):
+    def size(self): return eSize(1920, 1080)
+
+def getDesktop(screen): return _Desktop()
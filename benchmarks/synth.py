@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+import random
+
+# ==========================================================
+# ملفات تجريبية - SoftCam.Key و biss.txt
+# ==========================================================
+SECTIONS = (("F", 0.6), ("V", 0.2), ("N", 0.1), ("I", 0.1))
+
+def hexkey(rnd, nbytes=8): return "".join("%02X" % rnd.randrange(256) for i in range(nbytes))
+
+def softcam_key(lines, seed=1):
+    # Section headers and comments like the merged files shipped by key sites.
+    rnd = random.Random(seed); out = []; n = 0
+    for ktype, share in SECTIONS:
+        count = int(lines * share); out.append(f"# ===== {ktype} keys =====\n")
+        for i in range(count):
+            n += 1
+            if ktype == "F": out.append(f"F {n & 0xFFFF:04X}{(n >> 16) + 0x100:04X} 00000000 {hexkey(rnd)} ;Feed Channel {n}\n")
+            elif ktype == "V": out.append(f"V {0x050000 + n:06X} {i % 16:02X} {hexkey(rnd, 16)} ;Viaccess {n}\n")
+            elif ktype == "N": out.append(f"N {n & 0xFFFF:04X} {i % 2:02X} {hexkey(rnd, 16)}\n")
+            else: out.append(f"I {n & 0xFFFF:04X} {i % 8:02X} {hexkey(rnd, 16)}\n")
+    return "".join(out)
+
+def biss_txt(size, seed=2):
+    # Mixed layouts: key on the transponder line, key on the next line, and free text.
+    rnd = random.Random(seed); out = []; total = 0; n = 0
+    while total < size:
+        n += 1; freq = 10700 + (n * 7) % 2050; pol = "HV"[n % 2]; sr = (2000, 3333, 7200, 27500)[n % 4]
+        k = hexkey(rnd)
+        if n % 3 == 0: block = f"{freq} {pol} {sr} Feed {n} | KEY {k}\n"
+        elif n % 3 == 1: block = f"{freq} {pol} {sr} Sport Feed {n}\nBISS: {' '.join(k[i:i + 2] for i in range(0, 16, 2))}\n"
+        else: block = f"# update {n}: reported working\n{freq}.5 MHz {pol} - {sr} News Feed {n}\n  {k}\n"
+        out.append(block); total += len(block)
+    return "".join(out)
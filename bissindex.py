@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+import os, re, threading, time
+from .fetch import fetch, cache_file, load_json, save_json
+from .diag import diag
+
+# ==========================================================
+# فهرس biss.txt حسب التردد
+# ==========================================================
+URL_BISS = "https://raw.githubusercontent.com/anow2008/softcam.key/refs/heads/main/biss.txt"
+INDEX_FILE = "biss.idx.json"
+STATE_FILE = "biss.state.json"
+MAX_AGE = 6 * 3600
+# A lookup miss only re-checks biss.txt when the last check is older than this.
+MISS_AGE = 10 * 60
+FREQ_TOLERANCE = 2
+POLARISATIONS = {0: "H", 1: "V", 2: "L", 3: "R"}
+
+RE_TP = re.compile(r"(?<![\d.])(\d{4,5})(?:[.,]\d+)?\s*(?:MHz)?\s*([HVLR])(?![A-Za-z])(?:[\s/:-]*(\d{3,5})(?![\d]))?", re.I)
+RE_FREQ = re.compile(r"^\W*(\d{4,5})(?![\d])")
+RE_KEY = re.compile(r"(?<![0-9A-Fa-f])([0-9A-Fa-f]{2}(?:[ \t]?[0-9A-Fa-f]{2}){7})(?![0-9A-Fa-f])")
+RE_NOISE = re.compile(r"(?i)\b(biss|key|keys|sid|vpid|sr|freq|mhz)\b[\s:=]*|[|;=]+|(?<!\w)[:\-]+|[:\-]+(?!\w)")
+
+def _name(text):
+    return " ".join(RE_NOISE.sub(" ", text).split())
+
+def parse_biss(text):
+    # A transponder line (freq, optional pol/SR) opens a record; keys on the
+    # same or following lines attach to it until the next transponder line.
+    index = {}; tp = None; pending = None
+    for line in text.splitlines():
+        k = RE_KEY.search(line)
+        m = RE_TP.search(line) or RE_FREQ.search(line)
+        if m and k and m.start(1) < k.end() and k.start() < m.end(1): m = None
+        rest = line
+        if m:
+            g = m.groups() + (None, None)
+            tp = (str(int(g[0])), (g[1] or "").upper(), int(g[2] or 0)); rest = line[:m.start()] + " " + line[m.end():]; pending = _name(rest)
+        if tp is None: continue
+        k = RE_KEY.search(rest)
+        if k:
+            name = _name(rest[:k.start()] + " " + rest[k.end():]) or pending or ""
+            index.setdefault(tp[0], []).append([tp[1], tp[2], name, re.sub(r"\s", "", k.group(1)).upper()])
+        elif not m and line.strip():
+            pending = _name(line) or pending
+    return index
+
+class BissIndex(object):
+    def __init__(self, url=URL_BISS, path=None):
+        self.url = url; self.path = path or cache_file(INDEX_FILE)
+        # checked/etag/modified change on every check and live in a small file
+        # of their own, so a 304 does not rewrite the index.
+        self.state_path = os.path.join(os.path.dirname(self.path), STATE_FILE)
+        self.lock = threading.Lock(); self._data = None
+
+    def _load(self):
+        if self._data is None:
+            data = {"etag": None, "modified": None, "checked": 0, "index": {}}
+            data.update(load_json(self.path) or {}); data.update(load_json(self.state_path) or {})
+            self._data = data
+        return self._data
+
+    def ready(self): return self._data is not None
+
+    def loaded(self):
+        with self.lock: return bool(self._load()["index"])
+
+    def stale(self, max_age=MAX_AGE):
+        with self.lock: return time.time() - self._load().get("checked", 0) > max_age
+
+    def refresh(self, timeout=10):
+        with self.lock:
+            data = self._load()
+            # The validators only describe an index we still have.
+            etag, modified = (data.get("etag"), data.get("modified")) if data["index"] else (None, None)
+        with diag.phase("biss.fetch") as p:
+            status, raw, etag, modified = fetch(self.url, etag, modified, timeout); p.bytes = len(raw or b"")
+        # Parsed and saved outside the lock: zaps keep looking up the old
+        # index until the new one is swapped in.
+        data = dict(data); data["checked"] = int(time.time())
+        state = {"etag": data.get("etag"), "modified": data.get("modified"), "checked": data["checked"]}
+        if status != 304:
+            with diag.phase("biss.parse"): data.update({"etag": etag, "modified": modified, "index": parse_biss(raw.decode("utf-8", "replace"))})
+            state.update({"etag": etag, "modified": modified})
+            # Written before the state, and without validators when it fails,
+            # so a saved etag never vouches for an older index on disk.
+            try: save_json(self.path, {"index": data["index"]})
+            except (IOError, OSError): state.update({"etag": None, "modified": None})
+        with self.lock: self._data = data
+        try: save_json(self.state_path, state)
+        except (IOError, OSError): pass
+        return status != 304
+
+    def lookup(self, freq, pol="", sr=0, name="", strict=False):
+        # strict is for automatic applies: a record only counts when its name
+        # matches the service name, not just its frequency.
+        with self.lock: index = self._load()["index"]
+        freq = int(freq); pol = (pol or "").upper(); name = (name or "").lower(); best = None
+        for delta in range(FREQ_TOLERANCE + 1):
+            for f in set((freq - delta, freq + delta)):
+                for rec in index.get(str(f), ()):
+                    if pol and rec[0] and rec[0] != pol: continue
+                    n = rec[2].lower(); named = bool(name and n and (n == name or name in n or n in name))
+                    if strict and not named: continue
+                    score = -delta * 4
+                    if sr and rec[1]: score += 4 if abs(rec[1] - sr) <= 2 else -8
+                    if named: score += 8 if n == name else 4
+                    if best is None or score > best[0]: best = (score, rec)
+            if best and best[0] >= 0: break
+        # A record that only shares a nearby frequency is not a match: its key
+        # would be written for the wrong channel.
+        return best[1] if best and best[0] >= 0 else None
+
+    def lookup_many(self, queries, progress=None, step=50, strict=False):
+        # queries: [(freq, pol, sr, name), ...] resolved against one loaded copy.
+        res = []
+        for i, q in enumerate(queries):
+            res.append(self.lookup(*q, strict=strict))
+            if progress and ((i + 1) % step == 0 or i + 1 == len(queries)): progress(i + 1, len(queries))
+        return res
+
+_index = None
+
+def get_biss_index():
+    global _index
+    if _index is None: _index = BissIndex()
+    return _index
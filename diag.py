@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+import collections, json, math, threading, time
+
+# ==========================================================
+# قياس زمن العمليات - سجل دائري في الذاكرة
+# ==========================================================
+RING_SIZE = 500
+LOG_FILE = "/tmp/bisspro_diag.jsonl"
+
+class Phase(object):
+    def __init__(self, diag, name):
+        self.diag = diag; self.name = name; self.bytes = 0
+    def __enter__(self):
+        # Monotonic: boxes often step the wall clock (NTP, transponder time) after boot.
+        self.start = time.monotonic(); return self
+    def __exit__(self, etype, value, tb):
+        # Failures are recorded with their type and still propagate.
+        self.diag.record(self.name, time.monotonic() - self.start, self.bytes, etype.__name__ if etype else None)
+        return False
+
+class Diagnostics(object):
+    def __init__(self, size=RING_SIZE):
+        self.records = collections.deque(maxlen=size); self.lock = threading.Lock(); self.log_file = None
+
+    def phase(self, name): return Phase(self, name)
+
+    def record(self, name, seconds, nbytes=0, error=None):
+        rec = {"t": round(time.time(), 3), "phase": name, "ms": round(seconds * 1000, 2), "bytes": nbytes, "error": error}
+        with self.lock:
+            self.records.append(rec); log_file = self.log_file
+        if log_file:
+            try:
+                with open(log_file, "a") as f: f.write(json.dumps(rec, separators=(",", ":")) + "\n")
+            except (IOError, OSError): pass
+
+    def clear(self):
+        with self.lock: self.records.clear()
+
+    def summary(self):
+        # [(phase, count, p50 ms, p95 ms, errors, bytes)] sorted by phase name.
+        with self.lock: records = list(self.records)
+        phases = {}
+        for r in records: phases.setdefault(r["phase"], []).append(r)
+        res = []
+        for name in sorted(phases):
+            recs = phases[name]; ms = sorted(r["ms"] for r in recs)
+            res.append((name, len(recs), percentile(ms, 50), percentile(ms, 95), sum(1 for r in recs if r["error"]), sum(r["bytes"] for r in recs)))
+        return res
+
+def percentile(values, pct):
+    # Nearest-rank on an already sorted list.
+    if not values: return 0.0
+    return values[min(len(values), max(1, int(math.ceil(pct / 100.0 * len(values))))) - 1]
+
+diag = Diagnostics()
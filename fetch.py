@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+import os, json
+
+# ==========================================================
+# التحميل الشرطي والتخزين المؤقت
+# ==========================================================
+# urllib.request (http.client, email, ssl) and the hashing/compression
+# modules are imported on first use so they stay off the enigma2 boot path.
+CACHE_DIR = "/etc/enigma2/bisspro/"
+USER_AGENT = "BissPro/1.0"
+
+def cache_file(name): return os.path.join(CACHE_DIR, name)
+
+def _request(url, etag=None, modified=None):
+    from urllib.request import Request
+    req = Request(url, headers={"User-Agent": USER_AGENT, "Accept-Encoding": "gzip"})
+    if etag: req.add_header("If-None-Match", etag)
+    if modified: req.add_header("If-Modified-Since", modified)
+    return req
+
+def fetch(url, etag=None, modified=None, timeout=10):
+    # Returns (status, data, etag, modified); status 304 means the cached copy is current.
+    import gzip
+    from urllib.request import urlopen
+    from urllib.error import HTTPError
+    try:
+        with urlopen(_request(url, etag, modified), timeout=timeout) as r:
+            data = r.read()
+            if r.headers.get("Content-Encoding", "").lower() == "gzip": data = gzip.decompress(data)
+            return r.getcode(), data, r.headers.get("ETag"), r.headers.get("Last-Modified")
+    except HTTPError as e:
+        if e.code == 304: return 304, None, etag, modified
+        raise
+
+def load_json(path, default=None):
+    try:
+        with open(path, "r") as f: return json.load(f)
+    except (IOError, OSError, ValueError): return default
+
+def save_json(path, data):
+    folder = os.path.dirname(path)
+    if folder and not os.path.isdir(folder): os.makedirs(folder)
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f, separators=(",", ":")); f.flush(); os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+def download(url, dest, etag=None, modified=None, progress=None, timeout=20, chunk=32768):
+    # Streams url into dest (gunzipping on the fly) and returns
+    # (status, etag, modified, sha256); on 304 dest is left untouched.
+    import hashlib, zlib
+    from urllib.request import urlopen
+    from urllib.error import HTTPError
+    try: r = urlopen(_request(url, etag, modified), timeout=timeout)
+    except HTTPError as e:
+        if e.code == 304: return 304, etag, modified, None
+        raise
+    with r:
+        total = int(r.headers.get("Content-Length") or 0); done = 0
+        inflate = zlib.decompressobj(16 + zlib.MAX_WBITS) if r.headers.get("Content-Encoding", "").lower() == "gzip" else None
+        digest = hashlib.sha256()
+        with open(dest, "wb") as f:
+            while True:
+                block = r.read(chunk)
+                if not block: break
+                done += len(block)
+                if inflate: block = inflate.decompress(block)
+                digest.update(block); f.write(block)
+                if progress: progress(done, total)
+            if inflate:
+                block = inflate.flush(); digest.update(block); f.write(block)
+            f.flush(); os.fsync(f.fileno())
+        return r.getcode(), r.headers.get("ETag"), r.headers.get("Last-Modified"), digest.hexdigest()
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+import threading, queue, weakref
+from .diag import diag
+
+# ==========================================================
+# منفذ المهام في الخلفية - نتائج تعود للخيط الرئيسي فقط
+# ==========================================================
+# Workers never touch widgets: results and progress updates are queued
+# and run by drain(), which the screens call from an eTimer.
+
+# Jobs that write SoftCam.Key: closing their screen must not lose the edit.
+WRITES = ("save", "editor-edit", "editor-delete")
+
+def is_write(key):
+    return (key[0] if isinstance(key, tuple) else key) in WRITES
+
+class Job(object):
+    def __init__(self, key, func, args, owner):
+        self.key = key; self.func = func; self.args = args; self.owner = owner
+        self.callbacks = []; self.cancelled = False; self.started = False
+
+class JobExecutor(object):
+    def __init__(self, workers=2):
+        self.workers = workers; self.lock = threading.Lock()
+        self._tasks = queue.Queue(); self._results = queue.Queue(); self._jobs = {}; self._threads = []
+        # Screens subclass dict and are not hashable, so closed owners are
+        # tracked by id; the weak values drop them once they are collected.
+        self._closed = weakref.WeakValueDictionary()
+
+    def submit(self, key, func, args=(), callback=None, owner=None):
+        # A job with the same key that is still queued or running is shared
+        # instead of being started a second time.
+        with self.lock:
+            job = self._jobs.get(key)
+            if job is None:
+                job = self._jobs[key] = Job(key, func, args, owner); self._tasks.put(job)
+                if len(self._threads) < self.workers:
+                    t = threading.Thread(target=self._worker); t.daemon = True; t.start(); self._threads.append(t)
+            if callback: job.callbacks.append((owner, callback))
+            return job
+
+    def busy(self, key=None):
+        with self.lock: return key in self._jobs if key is not None else bool(self._jobs)
+
+    def post(self, owner, func, *args):
+        self._results.put((owner, func, args))
+
+    def cancel(self, owner):
+        with self.lock:
+            for key, job in list(self._jobs.items()):
+                job.callbacks = [c for c in job.callbacks if c[0] is not owner]
+                # A job that already started runs to the end, and so does a
+                # queued write; only their results are dropped.
+                if job.owner is owner and not job.callbacks and not job.started and not is_write(key):
+                    job.cancelled = True; del self._jobs[key]
+            self._closed[id(owner)] = owner
+
+    def drain(self, limit=50):
+        for i in range(limit):
+            try: owner, func, args = self._results.get_nowait()
+            except queue.Empty: break
+            if owner is not None and self._closed.get(id(owner)) is owner: continue
+            # One failing callback must not stop the rest of the queue.
+            try: func(*args)
+            except Exception as e: diag.record("jobs.callback", 0, error=type(e).__name__)
+
+    def _worker(self):
+        while True:
+            job = self._tasks.get()
+            with self.lock:
+                if job.cancelled: continue
+                job.started = True
+            try: result = job.func(*job.args)
+            except Exception as e: result = e
+            with self.lock:
+                if self._jobs.get(job.key) is job: del self._jobs[job.key]
+                callbacks = [] if job.cancelled else list(job.callbacks)
+            for owner, cb in callbacks: self._results.put((owner, cb, (result,)))
+
+executor = JobExecutor()
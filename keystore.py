@@ -0,0 +1,309 @@
+# -*- coding: utf-8 -*-
+import os, threading, time, weakref
+from .diag import diag
+
+# ==========================================================
+# مخزن المفاتيح - SoftCam.Key مفهرس في الذاكرة
+# ==========================================================
+# Lines are kept as raw bytes so names in any encoding survive a rewrite
+# untouched. The index only maps "TYPE IDENT" to line numbers; entries are
+# decoded from their line when asked for, and an idle store drops its lines.
+
+IDLE_UNLOAD = 300
+
+def biss_id(sid, vpid):
+    return ("%04X" % (sid & 0xFFFF)) + ("%04X" % (vpid & 0xFFFF) if vpid != -1 else "0000")
+
+def format_line(ktype, ident, index, key, comment=""):
+    line = f"{ktype} {ident} {index} {key}"
+    if comment: line += f" ;{comment}"
+    return line
+
+def parse_line(raw):
+    text = raw.decode("utf-8", "replace").strip()
+    if not text or text[0] in "#;": return None
+    body, sep, comment = text.partition(";")
+    parts = body.split()
+    if len(parts) < 4 or len(parts[0]) != 1 or not parts[0].isalpha(): return None
+    return parts[0].upper(), parts[1].upper(), parts[2].upper(), parts[3].upper(), comment.strip(), text
+
+def ident_key(ktype, ident):
+    return (ktype + " " + ident).encode("utf-8").upper()
+
+def line_key(raw):
+    # Same rules as parse_line, on the bytes: b"F 0001 00 KEY" -> b"F 0001".
+    parts = raw.split(b";", 1)[0].split(None, 4)
+    if len(parts) < 4 or len(parts[0]) != 1 or not parts[0].isalpha(): return None
+    return parts[0].upper() + b" " + parts[1].upper()
+
+class KeyEntry(object):
+    __slots__ = ("ktype", "ident", "index", "key", "comment", "text", "lineno")
+    def __init__(self, ktype, ident, index, key, comment, text, lineno):
+        self.ktype = ktype; self.ident = ident; self.index = index; self.key = key
+        self.comment = comment; self.text = text; self.lineno = lineno
+    @property
+    def id(self): return (self.ktype, self.ident, self.index)
+    @property
+    def name(self): return self.comment or "Unknown"
+
+class KeyStore(object):
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.RLock()
+        self._stamp = None; self._loaded = False
+        self._timer = None; self.used = time.monotonic()
+        self._reset([])
+
+    def _reset(self, lines):
+        self._lines = lines; self._index = {}
+        self._append_from = None; self._rewrite = False
+        for n, raw in enumerate(lines):
+            key = line_key(raw)
+            if key is not None: self._link(key, n)
+
+    def _link(self, key, n):
+        # Merged files repeat an id for other satellites, so every line of an
+        # ident is indexed, in file order. A single line is stored as a bare
+        # int, which is the common case and saves a list per ident.
+        cur = self._index.get(key)
+        if cur is None: self._index[key] = n
+        elif isinstance(cur, int): self._index[key] = sorted({cur, n})
+        elif n not in cur: cur.append(n); cur.sort()
+
+    def _unlink(self, key, n):
+        cur = self._index[key]
+        if isinstance(cur, int): del self._index[key]; return
+        cur.remove(n)
+        if len(cur) == 1: self._index[key] = cur[0]
+
+    def _linenos(self, ktype, ident):
+        cur = self._index.get(ident_key(ktype, ident))
+        return [] if cur is None else [cur] if isinstance(cur, int) else list(cur)
+
+    def _entry(self, n):
+        p = parse_line(self._lines[n])
+        return KeyEntry(p[0], p[1], p[2], p[3], p[4], p[5], n)
+
+    def _id_lines(self, kid):
+        return [n for n in self._linenos(kid[0], kid[1]) if self._entry(n).index == kid[2]]
+
+    def _drop_entry(self, n):
+        self._unlink(line_key(self._lines[n]), n); self._lines[n] = None; self._rewrite = True
+
+    def _stat(self):
+        try:
+            st = os.stat(self.path)
+            return (st.st_mtime_ns, st.st_size)
+        except OSError: return None
+
+    def _dirty(self): return self._append_from is not None or self._rewrite
+
+    def _sync(self):
+        # Uncommitted changes are never thrown away by a re-parse.
+        self.used = time.monotonic()
+        if not self._dirty(): self.refresh()
+
+    def _arm(self, delay=IDLE_UNLOAD):
+        if self._timer is None:
+            # A weak reference, so a store nobody holds is not kept alive by it.
+            self._timer = threading.Timer(delay, _expire, (weakref.ref(self),)); self._timer.daemon = True; self._timer.start()
+
+    def _expire(self):
+        # Drops the lines and index once nothing has used the store for
+        # IDLE_UNLOAD seconds; the next call re-parses the file.
+        with self.lock:
+            self._timer = None
+            if not self._loaded: return
+            idle = time.monotonic() - self.used
+            if self._dirty() or idle < IDLE_UNLOAD: self._arm(max(1, IDLE_UNLOAD - idle)); return
+            self._reset([]); self._loaded = False; self._stamp = None
+
+    def refresh(self, force=False):
+        # Re-parse only when the file on disk is no longer the one we indexed.
+        with self.lock:
+            stamp = self._stat()
+            if self._loaded and not force and stamp == self._stamp: return False
+            with diag.phase("keys.parse") as p:
+                lines = []
+                if stamp is not None:
+                    with open(self.path, "rb") as f: lines = f.read().splitlines(True)
+                self._reset(lines); p.bytes = stamp[1] if stamp else 0
+            self._stamp = stamp; self._loaded = True; self._arm()
+            return True
+
+    # ------------------------------------------------------
+    # القراءة
+    # ------------------------------------------------------
+    def entries(self, ktype=None):
+        with self.lock: return [e for page in self.entry_pages(ktype) for e in page]
+
+    def entry_pages(self, ktype=None, size=1000):
+        # The entries in lists of size, decoded outside the lock from the
+        # lines as they were when it started.
+        with self.lock: self._sync(); lines = list(self._lines)
+        ktype = ktype.upper().encode("utf-8") if ktype else None; page = []
+        for n, raw in enumerate(lines):
+            key = line_key(raw) if raw is not None else None
+            if key is None or (ktype is not None and key[:1] != ktype): continue
+            page.append(KeyEntry(*parse_line(raw) + (n,)))
+            if len(page) == size: yield page; page = []
+        if page: yield page
+
+    def get(self, ktype, ident, index):
+        # The first line for the id when it appears more than once.
+        with self.lock:
+            self._sync()
+            lines = self._id_lines((ktype.upper(), ident.upper(), index.upper()))
+            return self._entry(lines[0]) if lines else None
+
+    def find(self, ktype, ident):
+        with self.lock:
+            self._sync()
+            return [self._entry(n) for n in self._linenos(ktype, ident)]
+
+    def _locate(self, e):
+        # Entries are matched by their line text, at their own line number
+        # first and then on the other lines of the id (after a re-parse).
+        for n in [e.lineno] + self._id_lines(e.id):
+            raw = self._lines[n] if n < len(self._lines) else None
+            if raw is not None and parse_line(raw)[5] == e.text: return n
+        return None
+
+    # ------------------------------------------------------
+    # التعديل
+    # ------------------------------------------------------
+    def _write_line(self, n, kid, key, comment):
+        # Sets line n (None appends) and returns False when it is unchanged.
+        text = format_line(kid[0], kid[1], kid[2], key.upper(), comment)
+        if n is None:
+            tail = len(self._lines) - 1
+            while tail >= 0 and self._lines[tail] is None: tail -= 1
+            if tail >= 0 and not self._lines[tail].endswith(b"\n"):
+                self._lines[tail] += b"\n"; self._rewrite = True
+            n = len(self._lines); self._lines.append((text + "\n").encode("utf-8"))
+            if self._append_from is None: self._append_from = n
+            self._link(ident_key(kid[0], kid[1]), n)
+        else:
+            old = self._lines[n]
+            eol = old[len(old.rstrip(b"\r\n")):] or b"\n"
+            raw = text.encode("utf-8") + eol
+            if raw == old: return False
+            if self._append_from is None or n < self._append_from: self._rewrite = True
+            self._lines[n] = raw
+        return True
+
+    def put(self, ktype, ident, index, key, comment=""):
+        # Makes key the only one for the id: the first line is updated and
+        # any duplicates of the id are dropped.
+        with self.lock:
+            self._sync()
+            kid = (ktype.upper(), ident.upper(), index.upper())
+            lines = self._id_lines(kid)
+            changed = self._write_line(lines[0] if lines else None, kid, key, comment)
+            for n in lines[1:]: self._drop_entry(n); changed = True
+            return changed
+
+    def remove(self, ktype, ident, index):
+        with self.lock:
+            self._sync()
+            lines = self._id_lines((ktype.upper(), ident.upper(), index.upper()))
+            for n in lines: self._drop_entry(n)
+            return bool(lines)
+
+    def remove_ident(self, ktype, ident, keep=None):
+        with self.lock:
+            changed = False
+            for e in self.find(ktype, ident):
+                if keep is None or e.index != keep.upper(): changed = self.remove(e.ktype, e.ident, e.index) or changed
+            return changed
+
+    def update_entry(self, entry, key, comment=None):
+        # Edits exactly the line the entry came from; None when it is gone.
+        with self.lock:
+            self._sync(); n = self._locate(entry)
+            if n is None: return None
+            self._write_line(n, entry.id, key, entry.comment if comment is None else comment)
+            return self._entry(n)
+
+    def remove_entry(self, entry):
+        with self.lock:
+            self._sync(); n = self._locate(entry)
+            if n is None: return False
+            self._drop_entry(n); return True
+
+    def merge(self, lines):
+        # Remote entries win on key changes; local-only entries are kept.
+        # Remote keys already on a local line of the id stay as they are, new
+        # ones take over the unmatched local lines and the rest are appended.
+        with self.lock:
+            self._sync(); remote = {}; changed = 0
+            for raw in lines:
+                p = parse_line(raw)
+                if p: remote.setdefault(p[:3], []).append(p)
+            for kid, recs in remote.items():
+                spare = [self._entry(n) for n in self._id_lines(kid)]; new = []
+                for p in recs:
+                    match = next((e for e in spare if e.key == p[3]), None)
+                    if match is not None: spare.remove(match)
+                    else: new.append(p)
+                for e, p in zip(spare, new): changed += self._write_line(e.lineno, kid, p[3], p[4] or e.comment)
+                for p in new[len(spare):]: changed += self._write_line(None, kid, p[3], p[4])
+            return changed
+
+    # ------------------------------------------------------
+    # الكتابة على القرص
+    # ------------------------------------------------------
+    def commit(self):
+        with self.lock:
+            if not self._dirty(): return False
+            try:
+                if self._rewrite or self._stamp is None or self._stat() != self._stamp:
+                    with diag.phase("keys.rewrite") as p: p.bytes = self._write_atomic()
+                else:
+                    with diag.phase("keys.append") as p: p.bytes = self._write_append()
+            except Exception:
+                # The pending edits are dropped so the next read re-parses
+                # whatever is on disk instead of writing them later.
+                self._append_from = None; self._rewrite = False; self._loaded = False
+                raise
+            self._append_from = None; self._rewrite = False
+            self._stamp = self._stat()
+            return True
+
+    def _write_append(self):
+        # Only new entries: they go on the end of the file, so the cost does
+        # not grow with its size. Existing lines are never rewritten in place.
+        data = b"".join(self._lines[self._append_from:])
+        with open(self.path, "ab") as f:
+            f.write(data); f.flush(); os.fsync(f.fileno())
+        return len(data)
+
+    def _write_atomic(self):
+        folder = os.path.dirname(self.path)
+        if folder and not os.path.isdir(folder): os.makedirs(folder)
+        tmp = self.path + ".tmp"
+        keep = [n for n, raw in enumerate(self._lines) if raw is not None]
+        lines = [self._lines[n] for n in keep]
+        try:
+            with open(tmp, "wb") as f:
+                f.writelines(lines); f.flush(); os.fsync(f.fileno())
+            try: os.chmod(tmp, os.stat(self.path).st_mode & 0o7777)
+            except OSError: pass
+            os.replace(tmp, self.path)
+        finally:
+            if os.path.exists(tmp): os.remove(tmp)
+        self._reset(lines)
+        return sum(len(raw) for raw in lines)
+
+def _expire(ref):
+    store = ref()
+    if store is not None: store._expire()
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+def get_store(path):
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None: store = _stores[path] = KeyStore(path)
+        return store
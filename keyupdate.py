@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+import os
+from .fetch import download, cache_file, load_json, save_json
+from .keystore import get_store
+from .diag import diag
+
+# ==========================================================
+# تحديث SoftCam.Key - تحميل شرطي ودمج بدون مسح المفاتيح اليدوية
+# ==========================================================
+URL_SOFTCAM = "https://raw.githubusercontent.com/anow2008/softcam.key/main/softcam.key"
+STATE_FILE = "softcam.state.json"
+
+UNCHANGED, UPDATED = "unchanged", "updated"
+
+def update_softcam(target, progress=None, url=URL_SOFTCAM, timeout=20):
+    # Returns (UNCHANGED|UPDATED, number of entries changed).
+    state_path = cache_file(STATE_FILE)
+    state = load_json(state_path, {})
+    folder = os.path.dirname(target)
+    if folder and not os.path.isdir(folder): os.makedirs(folder)
+    # Same filesystem as the live file so the first install can be a rename.
+    tmp = target + ".download"
+    # The saved validators only describe the file they were recorded for: a
+    # missing, empty or different SoftCam.Key is always fetched in full.
+    current = state.get("path") == target and os.path.exists(target) and os.path.getsize(target) > 0
+    etag, modified = (state.get("etag"), state.get("modified")) if current else (None, None)
+    try:
+        with diag.phase("softcam.download") as p:
+            status, etag, modified, digest = download(url, tmp, etag, modified, progress, timeout)
+            if status != 304: p.bytes = os.path.getsize(tmp)
+        if status == 304: return UNCHANGED, 0
+        store = get_store(target)
+        with store.lock:
+            if current and digest == state.get("sha256"): changed = 0
+            elif not store.entries():
+                os.replace(tmp, target); store.refresh(); changed = len(store.entries())
+            else:
+                with diag.phase("softcam.merge"):
+                    with open(tmp, "rb") as f: changed = store.merge(f)
+                store.commit()
+        try: save_json(state_path, {"path": target, "etag": etag, "modified": modified, "sha256": digest})
+        except (IOError, OSError): pass
+        return (UPDATED if changed else UNCHANGED), changed
+    finally:
+        if os.path.exists(tmp): os.remove(tmp)
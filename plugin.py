@@ -2,39 +2,42 @@
 from Plugins.Plugin import PluginDescriptor
 from Screens.Screen import Screen
 from Screens.MessageBox import MessageBox
+from Screens.ChoiceBox import ChoiceBox
+from Screens.VirtualKeyBoard import VirtualKeyBoard
 from Components.ActionMap import ActionMap
 from Components.MenuList import MenuList
 from Components.Label import Label
 from Components.ProgressBar import ProgressBar
 from Components.MultiContent import MultiContentEntryText, MultiContentEntryPixmapAlphaTest
-from enigma import iServiceInformation, gFont, eTimer, getDesktop, RT_VALIGN_TOP, RT_VALIGN_CENTER
+from Components.config import config, ConfigSubsection, ConfigYesNo
+from enigma import iServiceInformation, iPlayableService, gFont, eTimer, getDesktop, RT_VALIGN_TOP
 from Tools.LoadPixmap import LoadPixmap
-import os, re, shutil, time
-from urllib.request import urlopen, urlretrieve
-from threading import Thread
+import os, threading, time
+# v1.0 updated itself by replacing plugin.py alone, so the helper modules
+# can be missing; the plugin then only offers to fetch them (repair_modules).
+try:
+    from .keystore import get_store, biss_id
+    from .jobs import executor
+    from .diag import diag, LOG_FILE
+    from .softcam import get_softcam_path, reloader
+    from .bissindex import get_biss_index, POLARISATIONS, MISS_AGE
+    from .keyupdate import update_softcam, UPDATED
+    from .services import get_service_db, list_bouquets, bouquet_services, parse_ref
+    from .selfupdate import cached_version, check_due, check_version, is_newer, install_update
+    MISSING = None
+except ImportError as e: MISSING = str(e)
 
 # ==========================================================
 # التعريفات والروابط
 # ==========================================================
 PLUGIN_PATH = "/usr/lib/enigma2/python/Plugins/Extensions/BissPro/"
 VERSION_NUM = "v1.0"
-URL_VERSION = "https://raw.githubusercontent.com/anow2008/BissPro/refs/heads/main/version.txt"
-URL_PLUGIN = "https://raw.githubusercontent.com/anow2008/BissPro/refs/heads/main/plugin.py"
-
-def get_softcam_path():
-    paths = ["/etc/tuxbox/config/oscam/SoftCam.Key", "/etc/tuxbox/config/ncam/SoftCam.Key", "/etc/tuxbox/config/SoftCam.Key", "/usr/keys/SoftCam.Key"]
-    for p in paths:
-        if os.path.exists(p): return p
-    return "/etc/tuxbox/config/oscam/SoftCam.Key"
-
-def restart_softcam_global():
-    os.system("killall -9 oscam ncam vicardd gbox 2>/dev/null")
-    time.sleep(1.2)
-    scripts = ["/etc/init.d/softcam", "/etc/init.d/cardserver", "/etc/init.d/softcam.oscam", "/etc/init.d/softcam.ncam"]
-    for s in scripts:
-        if os.path.exists(s):
-            os.system(f"'{s}' restart >/dev/null 2>&1")
-            break
+URL_REPAIR = "https://raw.githubusercontent.com/anow2008/BissPro/refs/heads/main/"
+
+config.plugins.BissPro = ConfigSubsection()
+config.plugins.BissPro.autozap = ConfigYesNo(default=False)
+config.plugins.BissPro.diaglog = ConfigYesNo(default=False)
+if not MISSING and config.plugins.BissPro.diaglog.value: diag.log_file = LOG_FILE
 
 class AutoScale:
     def __init__(self):
@@ -43,6 +46,16 @@ class AutoScale:
     def px(self, v): return int(v * self.scale)
     def font(self, v): return int(max(20, v * self.scale))
 
+# Skins and the main menu only depend on the desktop size (and the autozap
+# label), so they are built once per resolution and reused on every open.
+_skins = {}
+_menus = {}
+
+def cached_skin(name, ui, build):
+    key = (name, ui.scale)
+    if key not in _skins: _skins[key] = build()
+    return _skins[key]
+
 # ==========================================================
 # الشاشة الرئيسية
 # ==========================================================
@@ -50,7 +63,7 @@ class BISSPro(Screen):
     def __init__(self, session):
         self.ui = AutoScale()
         Screen.__init__(self, session)
-        self.skin = f"""
+        self.skin = cached_skin("BISSPro", self.ui, lambda: f"""
         <screen position="center,center" size="{self.ui.px(1100)},{self.ui.px(780)}" title="BissPro Smart">
             <widget name="date_label" position="{self.ui.px(50)},{self.ui.px(20)}" size="{self.ui.px(450)},{self.ui.px(40)}" font="Regular;{self.ui.font(26)}" halign="left" foregroundColor="#bbbbbb" transparent="1" />
             <widget name="time_label" position="{self.ui.px(750)},{self.ui.px(20)}" size="{self.ui.px(300)},{self.ui.px(40)}" font="Regular;{self.ui.font(26)}" halign="right" foregroundColor="#ffffff" transparent="1" />
@@ -67,7 +80,7 @@ class BISSPro(Screen):
             <eLabel position="{self.ui.px(760)},{self.ui.px(585)}" size="{self.ui.px(25)},{self.ui.px(25)}" backgroundColor="#0000ff" />
             <widget name="btn_blue" position="{self.ui.px(795)},{self.ui.px(250)},{self.ui.px(40)}" font="Regular;{self.ui.font(24)}" transparent="1" />
             <widget name="status" position="{self.ui.px(50)},{self.ui.px(660)}" size="{self.ui.px(1000)},{self.ui.px(70)}" font="Regular;{self.ui.font(32)}" halign="center" valign="center" transparent="1" foregroundColor="#f0a30a"/>
-        </screen>"""
+        </screen>""")
         self["btn_red"] = Label("Add Key")
         self["btn_green"] = Label("Editor")
         self["btn_yellow"] = Label("Update")
@@ -86,6 +99,13 @@ class BISSPro(Screen):
         try: self.timer.callback.append(self.show_result)
         except: self.timer.timeout.connect(self.show_result)
         
+        self.job_timer = eTimer()
+        try: self.job_timer.callback.append(executor.drain)
+        except: self.job_timer.timeout.connect(executor.drain)
+        self.job_timer.start(100)
+        reloader.listeners.append(self.on_reload)
+        self.onClose.append(self.close_jobs)
+        
         self["menu"] = MenuList([])
         self["actions"] = ActionMap(["OkCancelActions", "ColorActions"], {"ok": self.ok, "cancel": self.close, "red": self.action_add, "green": self.action_editor, "yellow": self.action_update, "blue": self.action_auto}, -1)
         self.onLayoutFinish.append(self.build_menu)
@@ -93,43 +113,64 @@ class BISSPro(Screen):
         self.update_clock()
 
     def check_for_updates(self):
-        Thread(target=self.thread_check_version).start()
+        # Opening the plugin only reads the cached result; the network check
+        # runs in the background at most once per CHECK_INTERVAL.
+        remote_v = cached_version()
+        if remote_v and is_newer(remote_v, VERSION_NUM): self.version_checked(remote_v)
+        elif check_due(): executor.submit("version", check_version, callback=self.version_checked, owner=self)
 
-    def thread_check_version(self):
-        try:
-            remote_v = urlopen(URL_VERSION, timeout=7).read().decode("utf-8").strip()
-            current_v = VERSION_NUM.replace("v", "")
-            if float(remote_v) > float(current_v):
-                self.session.openWithCallback(self.install_update, MessageBox, f"New Update v{remote_v} Available!\nInstall now?", MessageBox.TYPE_YESNO)
-        except: pass
+    def version_checked(self, remote_v):
+        if isinstance(remote_v, str) and is_newer(remote_v, VERSION_NUM):
+            self.session.openWithCallback(self.install_update, MessageBox, f"New Update v{remote_v} Available!\nInstall now?", MessageBox.TYPE_YESNO)
 
     def install_update(self, answer):
         if answer:
             self["status"].setText("Updating Plugin...")
-            Thread(target=self.do_plugin_download).start()
+            executor.submit("plugin", self.do_plugin_download, callback=self.job_done, owner=self)
 
     def do_plugin_download(self):
         try:
-            urlretrieve(URL_PLUGIN, PLUGIN_PATH + "plugin.py")
-            self.res = (True, "Plugin Updated! Please Restart GUI.")
-        except: self.res = (False, "Update Failed!")
-        self.timer.start(100, True)
+            with diag.phase("plugin_update.total"): install_update(PLUGIN_PATH)
+            return (True, "Plugin Updated! Please Restart GUI.")
+        except Exception as e: return (False, f"Update Failed! ({type(e).__name__})")
+
+    def job_done(self, res):
+        self.res = res if isinstance(res, tuple) else (False, "Unexpected Error")
+        self["status"].setText("Ready"); self.show_result()
+
+    def post(self, func, *args): executor.post(self, func, *args)
+
+    def close_jobs(self):
+        self.job_timer.stop(); executor.cancel(self)
+        if self.on_reload in reloader.listeners: reloader.listeners.remove(self.on_reload)
+
+    def on_reload(self, method): self.post(self.reload_done, method)
+
+    def reload_done(self, method):
+        if method == "reread": self["status"].setText("Softcam Keys Reloaded")
+        elif method == "restart": self["status"].setText("Softcam Restarted")
+        else: self["status"].setText("Softcam Reload Failed")
 
     def update_clock(self):
         self["time_label"].setText(time.strftime("%H:%M:%S"))
         self["date_label"].setText(time.strftime("%A, %d %B %Y"))
 
     def build_menu(self):
+        key = (self.ui.scale, config.plugins.BissPro.autozap.value)
+        if key not in _menus: _menus[key] = self.menu_entries()
+        self["menu"].l.setList(_menus[key])
+        if hasattr(self["menu"].l, 'setFont'): 
+            self["menu"].l.setFont(0, gFont("Regular", self.ui.font(36))); self["menu"].l.setFont(1, gFont("Regular", self.ui.font(24)))
+
+    def menu_entries(self):
         icon_dir = PLUGIN_PATH + "icons/"
-        menu_items = [("Add", "Add BISS Key Manually", "add", icon_dir + "add.png"), ("Key Editor", "Edit or Delete Stored Keys", "editor", icon_dir + "editor.png"), ("Update Softcam", "Download latest SoftCam.Key", "upd", icon_dir + "update.png"), ("Smart Auto Search", "Auto find key for current channel", "auto", icon_dir + "auto.png")]
+        menu_items = [("Add", "Add BISS Key Manually", "add", icon_dir + "add.png"), ("Key Editor", "Edit or Delete Stored Keys", "editor", icon_dir + "editor.png"), ("Update Softcam", "Download latest SoftCam.Key", "upd", icon_dir + "update.png"), ("Smart Auto Search", "Auto find key for current channel", "auto", icon_dir + "auto.png"), ("Bulk Auto Search", "Find keys for a whole bouquet or transponder", "bulk", icon_dir + "autoadd.png"), ("Auto Apply on Zap", "Apply known keys when zapping: " + ("On" if config.plugins.BissPro.autozap.value else "Off"), "autozap", icon_dir + "settings.png"), ("Diagnostics", "Timing per operation (p50/p95)", "diag", icon_dir + "plugin.png")]
         lst = []
         for name, desc, act, icon_path in menu_items:
             pixmap = LoadPixmap(cached=True, path=icon_path)
             res = (name, [MultiContentEntryPixmapAlphaTest(pos=(self.ui.px(15), self.ui.px(15)), size=(self.ui.px(70), self.ui.px(70)), png=pixmap), MultiContentEntryText(pos=(self.ui.px(110), self.ui.px(10)), size=(self.ui.px(850), self.ui.px(45)), font=0, text=name, flags=RT_VALIGN_TOP), MultiContentEntryText(pos=(self.ui.px(110), self.ui.px(55)), size=(self.ui.px(850), self.ui.px(35)), font=1, text=desc, flags=RT_VALIGN_TOP, color=0xbbbbbb), act])
             lst.append(res)
-        self["menu"].l.setList(lst)
-        if hasattr(self["menu"].l, 'setFont'): 
-            self["menu"].l.setFont(0, gFont("Regular", self.ui.font(36))); self["menu"].l.setFont(1, gFont("Regular", self.ui.font(24)))
+        return lst
 
     def ok(self):
         curr = self["menu"].getCurrent()
@@ -139,6 +180,15 @@ class BISSPro(Screen):
             elif act == "editor": self.action_editor()
             elif act == "upd": self.action_update()
             elif act == "auto": self.action_auto()
+            elif act == "bulk": self.action_bulk()
+            elif act == "autozap": self.toggle_autozap()
+            elif act == "diag": self.session.open(DiagnosticsScreen)
+
+    def toggle_autozap(self):
+        config.plugins.BissPro.autozap.value = not config.plugins.BissPro.autozap.value
+        config.plugins.BissPro.autozap.save()
+        if config.plugins.BissPro.autozap.value: ZapWatcher.start(self.session)
+        idx = self["menu"].getSelectionIndex(); self.build_menu(); self["menu"].moveToIndex(idx)
 
     def action_add(self):
         service = self.session.nav.getCurrentService()
@@ -151,59 +201,114 @@ class BISSPro(Screen):
         service = self.session.nav.getCurrentService()
         if not service: return
         info = service.info()
-        combined_id = ("%04X" % (info.getInfo(iServiceInformation.sSID) & 0xFFFF)) + ("%04X" % (info.getInfo(iServiceInformation.sVideoPID) & 0xFFFF) if info.getInfo(iServiceInformation.sVideoPID) != -1 else "0000")
-        if self.save_biss_key(combined_id, key, info.getName()): self.res = (True, f"Saved: {info.getName()}")
-        else: self.res = (False, "File Error")
-        self.timer.start(100, True)
+        combined_id = biss_id(info.getInfo(iServiceInformation.sSID), info.getInfo(iServiceInformation.sVideoPID))
+        name = info.getName(); self["status"].setText("Saving Key...")
+        executor.submit(("save", combined_id, key), self.save_biss_key, (combined_id, key, name), callback=lambda ok: self.job_done((True, f"Saved: {name}") if ok is True else (False, f"File Error ({type(ok).__name__})")), owner=self)
 
     def save_biss_key(self, full_id, key, name):
-        target = get_softcam_path()
-        try:
-            lines = []
-            if os.path.exists(target):
-                with open(target, "r") as f:
-                    for line in f:
-                        if f"F {full_id.upper()}" not in line.upper(): lines.append(line)
-            lines.append(f"F {full_id.upper()} 00000000 {key.upper()} ;{name}\n")
-            with open(target, "w") as f: f.writelines(lines)
-            restart_softcam_global(); return True
-        except: return False
+        # Write errors propagate so the caller can report their type.
+        store = get_store(get_softcam_path())
+        with diag.phase("keys.save"), store.lock:
+            store.remove_ident("F", full_id, keep="00000000")
+            store.put("F", full_id, "00000000", key, name); store.commit()
+        reloader.schedule(); return True
 
     def show_result(self): self["main_progress"].setValue(0); self.session.open(MessageBox, self.res[1], MessageBox.TYPE_INFO if self.res[0] else MessageBox.TYPE_ERROR, timeout=5)
 
-    def action_update(self): self["status"].setText("Updating Softcam..."); self["main_progress"].setValue(50); Thread(target=self.do_update).start()
+    def action_update(self):
+        self["status"].setText("Updating Softcam..."); self["main_progress"].setValue(0)
+        executor.submit("softcam", self.do_update, callback=self.job_done, owner=self)
+    def update_progress(self, done, total):
+        if total: self["main_progress"].setValue(min(100, int(done * 100 / total)))
     def do_update(self):
         try:
-            urlretrieve("https://raw.githubusercontent.com/anow2008/softcam.key/main/softcam.key", "/tmp/SoftCam.Key")
-            shutil.copy("/tmp/SoftCam.Key", get_softcam_path()); restart_softcam_global(); self.res = (True, "Softcam Updated")
-        except: self.res = (False, "Softcam Update Failed")
-        self.timer.start(100, True)
+            with diag.phase("update.total"): result, changed = update_softcam(get_softcam_path(), lambda done, total: self.post(self.update_progress, done, total))
+            if result == UPDATED: reloader.schedule(); return (True, f"Softcam Updated ({changed} keys)")
+            return (True, "Softcam Already Up To Date")
+        except Exception as e: return (False, f"Softcam Update Failed ({type(e).__name__})")
 
     def action_auto(self):
         service = self.session.nav.getCurrentService()
-        if service: self["status"].setText("Searching Online..."); self["main_progress"].setValue(40); Thread(target=self.do_auto, args=(service,)).start()
+        if not service: return
+        # Service info is read here on the main thread; the job only gets plain values.
+        info = service.info(); ch_name = info.getName(); t_data = info.getInfoObject(iServiceInformation.sTransponderData) or {}
+        curr_freq = str(int(t_data.get("frequency", 0) / 1000 if t_data.get("frequency", 0) > 50000 else t_data.get("frequency", 0)))
+        pol = POLARISATIONS.get(t_data.get("polarization"), ""); sr = int(t_data.get("symbol_rate", 0) / 1000)
+        combined_id = biss_id(info.getInfo(iServiceInformation.sSID), info.getInfo(iServiceInformation.sVideoPID))
+        self["status"].setText("Searching Online..."); self["main_progress"].setValue(40)
+        executor.submit(("auto", combined_id), self.do_auto, (combined_id, ch_name, curr_freq, pol, sr), callback=self.job_done, owner=self)
 
-    def do_auto(self, service):
+    def do_auto(self, combined_id, ch_name, curr_freq, pol, sr):
+        index = get_biss_index(); refreshed = False; started = time.monotonic(); error = None
         try:
-            info = service.info(); ch_name = info.getName(); t_data = info.getInfoObject(iServiceInformation.sTransponderData)
-            curr_freq = str(int(t_data.get("frequency", 0) / 1000 if t_data.get("frequency", 0) > 50000 else t_data.get("frequency", 0)))
-            raw_sid = info.getInfo(iServiceInformation.sSID); combined_id = ("%04X" % (raw_sid & 0xFFFF)) + ("%04X" % (info.getInfo(iServiceInformation.sVideoPID) & 0xFFFF))
-            raw_data = urlopen("https://raw.githubusercontent.com/anow2008/softcam.key/refs/heads/main/biss.txt", timeout=10).read().decode("utf-8")
-            self["main_progress"].setValue(70)
-            m = re.search(re.escape(curr_freq) + r'.*?(([0-9A-Fa-f]{2}[\s\t]*){8})', raw_data, re.I | re.S)
-            if m:
-                key = m.group(1).replace(" ", "").upper()
-                if self.save_biss_key(combined_id, key, ch_name): self.res = (True, f"Key Found: {key}")
-                else: self.res = (False, "Save Error")
-            else: self.res = (False, f"No Key Found for Freq {curr_freq}")
-        except Exception: self.res = (False, "Network Error")
-        self.timer.start(100, True)
+            with diag.phase("auto.lookup"): rec = index.lookup(curr_freq, pol, sr, ch_name)
+            # A miss re-checks biss.txt, but not again right after a check.
+            if rec is None and index.stale(MISS_AGE):
+                try: index.refresh(); refreshed = True
+                except Exception:
+                    if not index.loaded(): raise
+                self.post(self["main_progress"].setValue, 70)
+                with diag.phase("auto.lookup"): rec = index.lookup(curr_freq, pol, sr, ch_name)
+            if rec:
+                key = rec[3]
+                try: self.save_biss_key(combined_id, key, ch_name); res = (True, f"Key Found: {key}")
+                except Exception as e: res = (False, "Save Error"); error = type(e).__name__
+            else: res = (False, f"No Key Found for Freq {curr_freq}")
+        except Exception as e: res = (False, f"Network Error ({type(e).__name__})"); error = type(e).__name__
+        # A plain miss is not an error: the field only ever holds an exception type.
+        diag.record("auto.total", time.monotonic() - started, error=error)
+        if not refreshed and index.stale(): executor.submit("biss-refresh", index.refresh)
+        return res
+
+    def action_bulk(self):
+        choices = [("Current Transponder", None)] + list_bouquets()
+        self.session.openWithCallback(self.bulk_selected, ChoiceBox, title="Bulk Auto Search", list=choices)
+
+    def bulk_selected(self, choice):
+        if choice is None: return
+        ref = self.session.nav.getCurrentlyPlayingServiceReference()
+        current = parse_ref(ref.toString()) if ref else None
+        if choice[1] is None and current is None: return
+        self["status"].setText(f"Bulk Searching: {choice[0]}"); self["main_progress"].setValue(0)
+        executor.submit("bulk", self.do_bulk, (choice[1], current), callback=self.job_done, owner=self)
+
+    def bulk_progress(self, done, total):
+        self["main_progress"].setValue(int(done * 100 / total)); self["status"].setText(f"Resolving {done}/{total}")
+
+    def do_bulk(self, bouquet, current):
+        try:
+            db = get_service_db(); index = get_biss_index()
+            keys = bouquet_services(bouquet) if bouquet else [(s.sid, s.ns, s.tsid, s.onid) for s in db.transponder(current)]
+            svcs = []; seen = set()
+            # Free-to-air services never need a key, whatever biss.txt lists on their frequency.
+            for s in (db.get(k) for k in keys):
+                if s and s.crypted and (s.sid, s.tsid, s.onid) not in seen: seen.add((s.sid, s.tsid, s.onid)); svcs.append(s)
+            if not svcs: return (False, "No Scrambled Services Found")
+            if not index.loaded() or index.stale():
+                try: index.refresh()
+                except Exception:
+                    if not index.loaded(): raise
+            recs = index.lookup_many([(s.freq, s.pol, s.sr, s.name) for s in svcs], progress=lambda done, total: self.post(self.bulk_progress, done, total), strict=True)
+            store = get_store(get_softcam_path()); added = 0; hits = 0; lines = []
+            with store.lock:
+                for s, rec in zip(svcs, recs):
+                    if rec is None: continue
+                    hits += 1; full_id = biss_id(s.sid, s.vpid)
+                    # Like auto-zap, Bulk only fills in missing keys; a stored one is never replaced.
+                    if store.find("F", full_id): lines.append(f"{s.name}: already stored"); continue
+                    store.put("F", full_id, "00000000", rec[3], s.name); added += 1; lines.append(f"{s.name}: {rec[3]}")
+                store.commit()
+            if added: reloader.schedule()
+            more = f"\n... +{len(lines) - 15} more" if len(lines) > 15 else ""
+            return (True, f"Found {hits} of {len(svcs)} services, {added} new\n" + "\n".join(lines[:15]) + more)
+        except Exception as e: return (False, f"Bulk Search Failed ({type(e).__name__})")
 
 class BissManagerList(Screen):
+    PAGE_SIZE = 100
     def __init__(self, session):
         self.ui = AutoScale()
         Screen.__init__(self, session)
-        self.skin = f"""
+        self.skin = cached_skin("BissManagerList", self.ui, lambda: f"""
         <screen position="center,center" size="{self.ui.px(1000)},{self.ui.px(700)}" title="BissPro Smart - Key Editor">
             <widget name="keylist" position="{self.ui.px(20)},{self.ui.px(20)}" size="{self.ui.px(960)},{self.ui.px(520)}" itemHeight="{self.ui.px(50)}" scrollbarMode="showOnDemand" />
             <eLabel position="0,{self.ui.px(560)}" size="{self.ui.px(1000)},{self.ui.px(140)}" backgroundColor="#252525" zPosition="-1" />
@@ -211,51 +316,162 @@ class BissManagerList(Screen):
             <eLabel text="GREEN: Edit" position="{self.ui.px(75)},{self.ui.px(585)}" size="{self.ui.px(300)},{self.ui.px(40)}" font="Regular;26" transparent="1" />
             <eLabel position="{self.ui.px(30)},{self.ui.px(635)}" size="{self.ui.px(30)},{self.ui.px(30)}" backgroundColor="#ff0000" />
             <eLabel text="RED: Delete" position="{self.ui.px(75)},{self.ui.px(630)}" size="{self.ui.px(300)},{self.ui.px(40)}" font="Regular;26" transparent="1" />
-        </screen>"""
-        self["keylist"] = MenuList([]); self["actions"] = ActionMap(["OkCancelActions", "ColorActions"], {"green": self.edit_key, "cancel": self.close, "red": self.delete_confirm}, -1)
+            <eLabel position="{self.ui.px(330)},{self.ui.px(590)}" size="{self.ui.px(30)},{self.ui.px(30)}" backgroundColor="#ffff00" />
+            <eLabel text="YELLOW: Filter" position="{self.ui.px(375)},{self.ui.px(585)}" size="{self.ui.px(300)},{self.ui.px(40)}" font="Regular;26" transparent="1" />
+            <eLabel position="{self.ui.px(330)},{self.ui.px(635)}" size="{self.ui.px(30)},{self.ui.px(30)}" backgroundColor="#0000ff" />
+            <eLabel text="BLUE: Clear Filter" position="{self.ui.px(375)},{self.ui.px(630)}" size="{self.ui.px(300)},{self.ui.px(40)}" font="Regular;26" transparent="1" />
+            <widget name="info" position="{self.ui.px(660)},{self.ui.px(580)}" size="{self.ui.px(320)},{self.ui.px(95)}" font="Regular;24" halign="right" valign="center" foregroundColor="#bbbbbb" transparent="1" />
+        </screen>""")
+        self["keylist"] = MenuList([]); self["info"] = Label("")
+        self["actions"] = ActionMap(["OkCancelActions", "ColorActions", "ChannelSelectBaseActions"], {"green": self.edit_key, "cancel": self.close, "red": self.delete_confirm, "yellow": self.filter_keys, "blue": self.clear_filter, "nextBouquet": self.next_page, "prevBouquet": self.prev_page}, -1)
+        self.rows = []; self.view = []; self.page = 0; self.query = ""
+        self.loading = False; self.load_id = 0
+        self.job_timer = eTimer()
+        try: self.job_timer.callback.append(executor.drain)
+        except: self.job_timer.timeout.connect(executor.drain)
+        self.job_timer.start(100)
         self.onLayoutFinish.append(self.load_keys)
+        self.onClose.append(self.close_jobs)
+    def close_jobs(self): self.job_timer.stop(); executor.cancel(self)
     def load_keys(self):
-        path = get_softcam_path(); keys = []
-        if os.path.exists(path):
-            with open(path, "r") as f:
-                for line in f:
-                    if line.strip().upper().startswith("F "): keys.append(line.strip())
-        self["keylist"].setList(keys)
+        self.rows = []; self.view = []; self.page = 0; self.loading = True; self.load_id += 1
+        self["info"].setText("Loading...")
+        path = get_softcam_path()
+        executor.submit(("editor-load", id(self), self.load_id), self.read_keys, (path, self.load_id), callback=self.keys_loaded, owner=self)
+    def read_keys(self, path, load_id):
+        # Runs on the executor: each page of rows is shown as soon as it is decoded.
+        for page in get_store(path).entry_pages("F", self.PAGE_SIZE * 10): executor.post(self, self.keys_page, load_id, page)
+        return load_id
+    def keys_page(self, load_id, entries):
+        if load_id != self.load_id: return
+        shown = len(self.view) < (self.page + 1) * self.PAGE_SIZE
+        self.rows.extend(entries); self.view.extend(e for e in entries if self.match(e))
+        if shown: self.show_page(self["keylist"].getSelectionIndex())
+        else: self.update_info()
+    def keys_loaded(self, res):
+        if isinstance(res, Exception):
+            self.loading = False; self.update_info()
+            self.session.open(MessageBox, f"Could not read SoftCam.Key ({type(res).__name__})", MessageBox.TYPE_ERROR, timeout=5)
+        elif res == self.load_id: self.loading = False; self.update_info()
+    def match(self, e): return not self.query or self.query in e.text.upper()
+    def page_count(self): return max(1, (len(self.view) + self.PAGE_SIZE - 1) // self.PAGE_SIZE)
+    def update_info(self):
+        text = f"Page {self.page + 1}/{self.page_count()}\n{len(self.view)} keys"
+        if self.query: text += f" ({self.query})"
+        if self.loading: text += " ..."
+        self["info"].setText(text)
+    def show_page(self, index=0):
+        self.page = min(self.page, self.page_count() - 1); start = self.page * self.PAGE_SIZE
+        self["keylist"].setList([(e.text, e) for e in self.view[start:start + self.PAGE_SIZE]])
+        if index: self["keylist"].moveToIndex(min(index, len(self["keylist"].list) - 1))
+        self.update_info()
+    def next_page(self):
+        if self.page + 1 < self.page_count(): self.page += 1; self.show_page()
+    def prev_page(self):
+        if self.page > 0: self.page -= 1; self.show_page()
+    def filter_keys(self):
+        self.session.openWithCallback(self.filter_done, VirtualKeyBoard, title="Filter by channel name, SID or key", text=self.query)
+    def filter_done(self, text=None):
+        if text is None: return
+        query = text.strip().upper()
+        # A longer query can only narrow the current matches, so refine those instead of rescanning.
+        base = self.view if self.query and query.startswith(self.query) else self.rows
+        self.query = query; self.view = [e for e in base if self.match(e)]; self.page = 0; self.show_page()
+    def clear_filter(self):
+        if self.query: self.query = ""; self.view = list(self.rows); self.page = 0; self.show_page()
+    def selected(self):
+        sel = self["keylist"].getSelectionIndex(); pos = self.page * self.PAGE_SIZE + sel
+        return (sel, self.view[pos]) if self["keylist"].getCurrent() and pos < len(self.view) else (sel, None)
+    def replace_row(self, old, new):
+        self.rows[self.rows.index(old)] = new
+        if old in self.view: self.view[self.view.index(old)] = new
     def edit_key(self):
-        current = self["keylist"].getCurrent()
-        if current:
-            parts = current.split(); ch_name = current.split(";")[-1] if ";" in current else "Unknown"; self.old_line = current
-            self.session.openWithCallback(self.finish_edit, HexInputScreen, ch_name, parts[3])
+        sel, entry = self.selected()
+        if entry is None: return
+        self.old_entry = entry; self.edit_index = sel
+        self.session.openWithCallback(self.finish_edit, HexInputScreen, entry.name, entry.key)
     def finish_edit(self, new_key=None):
         if new_key is None: return
-        path = get_softcam_path(); parts = self.old_line.split(); parts[3] = str(new_key).upper(); new_line = " ".join(parts)
-        try:
-            with open(path, "r") as f: lines = f.readlines()
-            with open(path, "w") as f:
-                for line in lines:
-                    if line.strip() == self.old_line.strip(): f.write(new_line + "\n")
-                    else: f.write(line)
-            self.load_keys(); restart_softcam_global()
-        except: pass
+        e = self.old_entry; sel = self.edit_index
+        executor.submit(("editor-edit", e.lineno, str(new_key)), self.write_edit, (get_softcam_path(), e, str(new_key)), callback=lambda new: self.edit_done(e, sel, new), owner=self)
+    def write_edit(self, path, e, key):
+        # Runs on the executor: a re-parse or a merge holding the store lock never blocks the UI.
+        # Rows are edited by their own line, so a duplicate id elsewhere in the file is left alone.
+        store = get_store(path)
+        with diag.phase("editor.edit"), store.lock: new = store.update_entry(e, key); store.commit()
+        if new is not None: reloader.schedule()
+        return new
+    def edit_done(self, e, sel, new):
+        if not self.write_ok(new): return
+        self.replace_row(e, new)
+        lst = self["keylist"].list
+        if sel < len(lst) and lst[sel][1] is e:
+            lst[sel] = (new.text, new); self["keylist"].l.invalidateEntry(sel)
+    def write_ok(self, res):
+        if isinstance(res, Exception):
+            self.session.open(MessageBox, f"Could not write SoftCam.Key ({type(res).__name__})", MessageBox.TYPE_ERROR, timeout=5); return False
+        if not res:
+            self.session.open(MessageBox, "SoftCam.Key changed on disk, reloading", MessageBox.TYPE_INFO, timeout=5); self.load_keys(); return False
+        return True
     def delete_confirm(self):
-        current = self["keylist"].getCurrent()
-        if current: self.session.openWithCallback(self.delete_key, MessageBox, "Delete this key?", MessageBox.TYPE_YESNO)
+        sel, entry = self.selected()
+        if entry is not None: self.session.openWithCallback(self.delete_key, MessageBox, "Delete this key?", MessageBox.TYPE_YESNO)
     def delete_key(self, answer):
         if answer:
-            current = self["keylist"].getCurrent(); path = get_softcam_path()
-            try:
-                with open(path, "r") as f: lines = f.readlines()
-                with open(path, "w") as f:
-                    for line in lines:
-                        if line.strip() != current.strip(): f.write(line)
-                self.load_keys(); restart_softcam_global()
-            except: pass
+            sel, entry = self.selected()
+            if entry is None: return
+            executor.submit(("editor-delete", entry.lineno), self.write_delete, (get_softcam_path(), entry), callback=lambda res: self.delete_done(entry, sel, res), owner=self)
+    def write_delete(self, path, entry):
+        store = get_store(path)
+        with diag.phase("editor.delete"), store.lock: removed = store.remove_entry(entry); store.commit()
+        if removed: reloader.schedule()
+        return removed
+    def delete_done(self, entry, sel, res):
+        if not self.write_ok(res) or entry not in self.rows: return
+        self.rows.remove(entry)
+        if entry in self.view: self.view.remove(entry)
+        self.show_page(sel)
+
+# ==========================================================
+# شاشة التشخيص
+# ==========================================================
+class DiagnosticsScreen(Screen):
+    def __init__(self, session):
+        self.ui = AutoScale()
+        Screen.__init__(self, session)
+        self.skin = cached_skin("DiagnosticsScreen", self.ui, lambda: f"""
+        <screen position="center,center" size="{self.ui.px(1000)},{self.ui.px(700)}" title="BissPro Smart - Diagnostics">
+            <widget name="header" position="{self.ui.px(20)},{self.ui.px(15)}" size="{self.ui.px(960)},{self.ui.px(40)}" font="Regular;24" foregroundColor="#f0a30a" transparent="1" />
+            <widget name="phases" position="{self.ui.px(20)},{self.ui.px(60)}" size="{self.ui.px(960)},{self.ui.px(480)}" itemHeight="{self.ui.px(40)}" scrollbarMode="showOnDemand" />
+            <eLabel position="0,{self.ui.px(560)}" size="{self.ui.px(1000)},{self.ui.px(140)}" backgroundColor="#252525" zPosition="-1" />
+            <eLabel position="{self.ui.px(30)},{self.ui.px(590)}" size="{self.ui.px(30)},{self.ui.px(30)}" backgroundColor="#00ff00" />
+            <eLabel text="GREEN: Refresh" position="{self.ui.px(75)},{self.ui.px(585)}" size="{self.ui.px(300)},{self.ui.px(40)}" font="Regular;26" transparent="1" />
+            <eLabel position="{self.ui.px(30)},{self.ui.px(635)}" size="{self.ui.px(30)},{self.ui.px(30)}" backgroundColor="#0000ff" />
+            <eLabel text="BLUE: Clear" position="{self.ui.px(75)},{self.ui.px(630)}" size="{self.ui.px(300)},{self.ui.px(40)}" font="Regular;26" transparent="1" />
+            <eLabel position="{self.ui.px(400)},{self.ui.px(590)}" size="{self.ui.px(30)},{self.ui.px(30)}" backgroundColor="#ffff00" />
+            <widget name="log_label" position="{self.ui.px(445)},{self.ui.px(585)}" size="{self.ui.px(540)},{self.ui.px(40)}" font="Regular;26" transparent="1" />
+        </screen>""")
+        self["header"] = Label(f"{'Phase':<22}{'n':>5}{'p50 ms':>11}{'p95 ms':>11}{'err':>5}{'KiB':>9}")
+        self["phases"] = MenuList([]); self["log_label"] = Label("")
+        self["actions"] = ActionMap(["OkCancelActions", "ColorActions"], {"cancel": self.close, "red": self.close, "green": self.refresh, "yellow": self.toggle_log, "blue": self.clear}, -1)
+        self.onLayoutFinish.append(self.refresh)
+    def refresh(self):
+        rows = [f"{name:<22}{n:>5}{p50:>11.1f}{p95:>11.1f}{err:>5}{nbytes / 1024.0:>9.1f}" for name, n, p50, p95, err, nbytes in diag.summary()]
+        self["phases"].setList(rows or ["No operations recorded yet"])
+        self["log_label"].setText("YELLOW: Log to " + LOG_FILE + (" (On)" if diag.log_file else " (Off)"))
+    def toggle_log(self):
+        config.plugins.BissPro.diaglog.value = not config.plugins.BissPro.diaglog.value; config.plugins.BissPro.diaglog.save()
+        diag.log_file = LOG_FILE if config.plugins.BissPro.diaglog.value else None; self.refresh()
+    def clear(self): diag.clear(); self.refresh()
+
+# The A-F bar for each selected letter, built once instead of on every key press.
+CHAR_BARS = ["".join((r"\c00f0a30a[ %s ]  " if c == sel else r"\c00ffffff  %s    ") % c for c in "ABCDEF") for sel in "ABCDEF"]
 
 class HexInputScreen(Screen):
     def __init__(self, session, channel_name="", existing_key=""):
         self.ui = AutoScale()
         Screen.__init__(self, session)
-        self.skin = f"""
+        self.skin = cached_skin("HexInputScreen", self.ui, lambda: f"""
         <screen position="center,center" size="{self.ui.px(1000)},{self.ui.px(650)}" title="BissPro Smart - Key Input" backgroundColor="#1a1a1a">
             <widget name="channel" position="{self.ui.px(10)},{self.ui.px(20)}" size="{self.ui.px(980)},{self.ui.px(60)}" font="Regular;{self.ui.font(42)}" halign="center" foregroundColor="#00ff00" transparent="1" />
             <widget name="progress" position="{self.ui.px(200)},{self.ui.px(100)}" size="{self.ui.px(600)},{self.ui.px(15)}" foregroundColor="#00ff00" />
@@ -271,7 +487,7 @@ class HexInputScreen(Screen):
             <widget name="l_yellow" position="{self.ui.px(545)},{self.ui.px(480)}" size="{self.ui.px(150)},{self.ui.px(40)}" font="Regular;{self.ui.font(26)}" transparent="1" />
             <eLabel position="{self.ui.px(740)},{self.ui.px(485)}" size="{self.ui.px(25)},{self.ui.px(25)}" backgroundColor="#0000ff" />
             <widget name="l_blue" position="{self.ui.px(775)},{self.ui.px(480)}" size="{self.ui.px(180)},{self.ui.px(40)}" font="Regular;{self.ui.font(26)}" transparent="1" />
-        </screen>"""
+        </screen>""")
         self["channel"] = Label(f"{channel_name}"); self["keylabel"] = Label(""); self["char_list"] = Label(""); self["progress"] = ProgressBar()
         self["l_red"] = Label("Exit"); self["l_green"] = Label("Save"); self["l_yellow"] = Label("Clear Dig"); self["l_blue"] = Label("Reset All")
         self["actions"] = ActionMap(["OkCancelActions", "ColorActions", "NumberActions", "DirectionActions"], {
@@ -280,28 +496,23 @@ class HexInputScreen(Screen):
             "0": lambda: self.keyNum("0"), "1": lambda: self.keyNum("1"), "2": lambda: self.keyNum("2"), "3": lambda: self.keyNum("3"), "4": lambda: self.keyNum("4"), "5": lambda: self.keyNum("5"), "6": lambda: self.keyNum("6"), "7": lambda: self.keyNum("7"), "8": lambda: self.keyNum("8"), "9": lambda: self.keyNum("9")
         }, -1)
         self.key_list = list(existing_key.upper()) if (existing_key and len(existing_key) == 16) else ["0"] * 16
-        self.index = 0; self.chars = ["A","B","C","D","E","F"]; self.char_index = 0; self.update_display()
+        self.index = 0; self.chars = ["A","B","C","D","E","F"]; self.char_index = 0; self.shown = (None, None, None); self.update_display()
 
     def update_display(self):
+        # Only the widgets whose content actually changed are redrawn.
         display_parts = []
         for i in range(16):
             char = self.key_list[i]
             if i == self.index: display_parts.append("[%s]" % char)
             else: display_parts.append(char)
             if (i + 1) % 4 == 0 and i < 15: display_parts.append(" - ")
-        self["keylabel"].setText("".join(display_parts))
-        self["progress"].setValue(int(((self.index + 1) / 16.0) * 100))
+        text = "".join(display_parts); value = int(((self.index + 1) / 16.0) * 100)
+        if text != self.shown[0]: self["keylabel"].setText(text)
+        if value != self.shown[1]: self["progress"].setValue(value)
         
         # تحسين عرض قائمة الحروف A-F مع الألوان والأقواس
-        char_bar = ""
-        color_yellow = "\c00f0a30a"
-        color_white = "\c00ffffff"
-        for c in self.chars:
-            if c == self.chars[self.char_index]:
-                char_bar += "%s[ %s ]  " % (color_yellow, c)
-            else:
-                char_bar += "%s  %s    " % (color_white, c)
-        self["char_list"].setText(char_bar)
+        if self.char_index != self.shown[2]: self["char_list"].setText(CHAR_BARS[self.char_index])
+        self.shown = (text, value, self.char_index)
 
     def clear_current(self): self.key_list[self.index] = "0"; self.update_display()
     def reset_all(self): self.key_list = ["0"] * 16; self.index = 0; self.update_display()
@@ -313,5 +524,100 @@ class HexInputScreen(Screen):
     def exit_clean(self): self.close(None)
     def save(self): self.close("".join(self.key_list))
 
-def main(session, **kwargs): session.open(BISSPro)
-def Plugins(**kwargs): return [PluginDescriptor(name="BissPro Smart", description="Smart BISS Manager", icon="plugin.png", where=PluginDescriptor.WHERE_PLUGINMENU, fnc=main)]
+# ==========================================================
+# تطبيق المفتاح تلقائيا عند تغيير القناة
+# ==========================================================
+class ZapWatcher(object):
+    instance = None
+    def __init__(self, session):
+        self.session = session; self.last_id = None
+        session.nav.event.append(self.on_event)
+        # Load the cached biss.txt index off the main loop so zaps only ever hit memory.
+        executor.submit("biss-load", get_biss_index().loaded)
+
+    @classmethod
+    def start(cls, session):
+        if cls.instance is None: cls.instance = cls(session)
+
+    def on_event(self, event):
+        if event != iPlayableService.evUpdatedInfo or not config.plugins.BissPro.autozap.value: return
+        service = self.session.nav.getCurrentService()
+        if not service: return
+        info = service.info(); sid = info.getInfo(iServiceInformation.sSID)
+        # Free-to-air services never need a key, whatever biss.txt lists on their frequency.
+        if sid <= 0 or info.getInfo(iServiceInformation.sIsCrypted) <= 0: return
+        full_id = biss_id(sid, info.getInfo(iServiceInformation.sVideoPID))
+        if full_id == self.last_id: return
+        index = get_biss_index()
+        if not index.ready(): return
+        self.last_id = full_id
+        t_data = info.getInfoObject(iServiceInformation.sTransponderData) or {}
+        freq = t_data.get("frequency", 0); freq = int(freq / 1000 if freq > 50000 else freq)
+        if not freq: return
+        rec = index.lookup(freq, POLARISATIONS.get(t_data.get("polarization"), ""), int(t_data.get("symbol_rate", 0) / 1000), info.getName(), strict=True)
+        if rec: executor.submit(("autozap", full_id), self.apply_key, (full_id, rec[3], info.getName()))
+
+    def apply_key(self, full_id, key, name):
+        # Runs on the executor and only fills in missing keys: any key already
+        # stored for this id, e.g. one entered by hand, is left alone.
+        store = get_store(get_softcam_path())
+        with store.lock:
+            if store.find("F", full_id): return False
+            store.put("F", full_id, "00000000", key, name); store.commit()
+        reloader.schedule(); return True
+
+# ==========================================================
+# إصلاح تحديث ناقص - تحميل الملفات المساعدة
+# ==========================================================
+def repair_modules(target_dir=PLUGIN_PATH, base=URL_REPAIR, timeout=20):
+    # Standard library only, since selfupdate.py may be one of the missing
+    # files. Every module listed in SHA256SUMS is checked and compiled
+    # before any of them is put in place.
+    import hashlib
+    from urllib.request import urlopen
+    with urlopen(base + "SHA256SUMS", timeout=timeout) as r: sums = r.read().decode("utf-8")
+    staged = []
+    for line in sums.splitlines():
+        parts = line.strip().split(None, 1)
+        if len(parts) != 2: continue
+        digest, name = parts[0].lower(), parts[1].lstrip("*")
+        if name == "plugin.py" or not name.endswith(".py") or os.path.basename(name) != name: continue
+        with urlopen(base + name, timeout=timeout) as r: data = r.read()
+        if hashlib.sha256(data).hexdigest() != digest: raise ValueError("checksum mismatch: " + name)
+        compile(data, name, "exec"); staged.append((name, data))
+    if not staged: raise ValueError("no modules listed in SHA256SUMS")
+    for name, data in staged:
+        tmp = os.path.join(target_dir, name + ".new")
+        with open(tmp, "wb") as f: f.write(data)
+        os.replace(tmp, os.path.join(target_dir, name))
+    return len(staged)
+
+class RepairJob(object):
+    instance = None
+    def __init__(self, session):
+        self.session = session; self.res = None
+        self.timer = eTimer()
+        try: self.timer.callback.append(self.poll)
+        except: self.timer.timeout.connect(self.poll)
+
+    def confirm(self, answer):
+        if not answer: return
+        threading.Thread(target=self.run, daemon=True).start(); self.timer.start(200)
+
+    def run(self):
+        try: self.res = (True, f"{repair_modules()} modules installed.\nPlease restart the GUI.")
+        except Exception as e: self.res = (False, f"Download Failed! ({type(e).__name__})")
+
+    def poll(self):
+        if self.res is None: return
+        self.timer.stop(); RepairJob.instance = None
+        self.session.open(MessageBox, self.res[1], MessageBox.TYPE_INFO if self.res[0] else MessageBox.TYPE_ERROR)
+
+def main(session, **kwargs):
+    if MISSING:
+        job = RepairJob.instance = RepairJob(session)
+        session.openWithCallback(job.confirm, MessageBox, f"BissPro update is incomplete ({MISSING}).\nDownload the missing files now?", MessageBox.TYPE_YESNO)
+    else: session.open(BISSPro)
+def sessionstart(reason, session=None, **kwargs):
+    if reason == 0 and session is not None and not MISSING and config.plugins.BissPro.autozap.value: ZapWatcher.start(session)
+def Plugins(**kwargs): return [PluginDescriptor(name="BissPro Smart", description="Smart BISS Manager", icon="plugin.png", where=PluginDescriptor.WHERE_PLUGINMENU, fnc=main), PluginDescriptor(where=PluginDescriptor.WHERE_SESSIONSTART, fnc=sessionstart)]
@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+import os, re, threading
+from .bissindex import POLARISATIONS
+
+# ==========================================================
+# قراءة lamedb والباقات بدون الحاجة لتشغيل القناة
+# ==========================================================
+E2_DIR = "/etc/enigma2/"
+RE_BOUQUET = re.compile(r'FROM BOUQUET "([^"]+)"')
+
+class ServiceInfo(object):
+    __slots__ = ("sid", "ns", "tsid", "onid", "name", "vpid", "freq", "pol", "sr", "crypted")
+    def __init__(self, sid, ns, tsid, onid, name="", vpid=-1, freq=0, pol="", sr=0, crypted=False):
+        self.sid = sid; self.ns = ns; self.tsid = tsid; self.onid = onid; self.name = name
+        self.vpid = vpid; self.freq = freq; self.pol = pol; self.sr = sr; self.crypted = crypted
+    @property
+    def tp(self): return (self.ns, self.tsid, self.onid)
+
+def parse_ref(ref):
+    # "1:0:19:SID:TSID:ONID:NS:0:0:0:" -> (sid, ns, tsid, onid)
+    f = ref.split(":")
+    if len(f) < 10: return None
+    try: return (int(f[3], 16), int(f[6], 16), int(f[4], 16), int(f[5], 16))
+    except ValueError: return None
+
+def _tp_line(data):
+    v = data.split(":")
+    try: return (int(int(v[0]) / 1000), POLARISATIONS.get(int(v[2]), ""), int(int(v[1]) / 1000))
+    except (ValueError, IndexError): return (0, "", 0)
+
+def _vpid(extra):
+    for item in extra.split(","):
+        if item.startswith("c:00") and len(item) >= 8:
+            try: return int(item[4:8], 16)
+            except ValueError: pass
+    return -1
+
+def _crypted(extra):
+    # lamedb lists the CAIDs a service was seen scrambled with as "C:xxxx".
+    return any(item.startswith("C:") for item in extra.split(","))
+
+def _service(key, name, extra, tps):
+    try: v = [int(x, 16) for x in key.split(":")[:4]]
+    except ValueError: return None
+    freq, pol, sr = tps.get((v[1], v[2], v[3]), (0, "", 0))
+    return ServiceInfo(v[0], v[1], v[2], v[3], name, _vpid(extra), freq, pol, sr, _crypted(extra))
+
+def parse_lamedb(text):
+    tps = {}; services = []
+    lines = text.splitlines()
+    if lines and "/5/" in lines[0]:
+        for line in lines:
+            if line.startswith("t:"):
+                key, sep, data = line[2:].partition(",")
+                try:
+                    if data.startswith("s:"): tps[tuple(int(x, 16) for x in key.split(":")[:3])] = _tp_line(data[2:])
+                except ValueError: pass
+        for line in lines:
+            if line.startswith("s:"):
+                m = re.match(r's:([^,]+),"((?:[^"]|"")*)",?(.*)', line)
+                if m: services.append(_service(m.group(1), m.group(2), m.group(3), tps))
+        return [s for s in services if s]
+    i = 0; n = len(lines)
+    while i < n and lines[i].strip() != "transponders": i += 1
+    i += 1
+    while i < n and lines[i].strip() != "end":
+        data = lines[i + 1].strip() if i + 1 < n else ""
+        try:
+            if data.startswith("s "): tps[tuple(int(x, 16) for x in lines[i].strip().split(":")[:3])] = _tp_line(data[2:])
+        except ValueError: pass
+        i += 1
+        while i < n and lines[i].strip() != "/": i += 1
+        i += 1
+    while i < n and lines[i].strip() != "services": i += 1
+    i += 1
+    while i + 2 < n and lines[i].strip() != "end":
+        services.append(_service(lines[i].strip(), lines[i + 1].strip(), lines[i + 2].strip(), tps)); i += 3
+    return [s for s in services if s]
+
+class ServiceDB(object):
+    def __init__(self, services):
+        self.by_key = {}; self.by_tp = {}; self.loose = {}
+        for s in services:
+            self.by_key[(s.sid, s.ns, s.tsid, s.onid)] = s; self.loose.setdefault((s.sid, s.tsid, s.onid), s)
+            self.by_tp.setdefault(s.tp, []).append(s)
+    def get(self, key):
+        return self.by_key.get(key) or self.loose.get((key[0], key[2], key[3]))
+    def transponder(self, key):
+        s = self.get(key)
+        return list(self.by_tp.get(s.tp, ())) if s else []
+
+_db = None; _db_stamp = None; _db_lock = threading.Lock()
+
+def get_service_db():
+    global _db, _db_stamp
+    path = E2_DIR + "lamedb5" if os.path.exists(E2_DIR + "lamedb5") else E2_DIR + "lamedb"
+    with _db_lock:
+        try: st = os.stat(path); stamp = (path, st.st_mtime_ns, st.st_size)
+        except OSError: stamp = None
+        if _db is None or stamp != _db_stamp:
+            text = ""
+            if stamp:
+                with open(path, "r", errors="replace") as f: text = f.read()
+            _db = ServiceDB(parse_lamedb(text)); _db_stamp = stamp
+        return _db
+
+def list_bouquets(kind="tv"):
+    res = []
+    try:
+        with open(E2_DIR + "bouquets." + kind, "r", errors="replace") as f:
+            for line in f:
+                m = RE_BOUQUET.search(line)
+                if m: res.append((bouquet_name(m.group(1)), m.group(1)))
+    except (IOError, OSError): pass
+    return res
+
+def bouquet_name(filename):
+    try:
+        with open(E2_DIR + filename, "r", errors="replace") as f:
+            for line in f:
+                if line.startswith("#NAME"): return line[5:].strip()
+    except (IOError, OSError): pass
+    return filename
+
+def bouquet_services(filename):
+    keys = []
+    try:
+        with open(E2_DIR + filename, "r", errors="replace") as f:
+            for line in f:
+                if line.startswith("#SERVICE ") and "FROM BOUQUET" not in line:
+                    ref = line[9:].strip()
+                    if ref.split(":")[1:2] == ["64"]: continue  # marker
+                    key = parse_ref(ref)
+                    if key and key[0]: keys.append(key)
+    except (IOError, OSError): pass
+    return keys
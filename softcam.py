@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+import os, threading, time
+from .diag import diag
+
+# ==========================================================
+# مسارات السوفتكام
+# ==========================================================
+KEY_PATHS = ["/etc/tuxbox/config/oscam/SoftCam.Key", "/etc/tuxbox/config/ncam/SoftCam.Key", "/etc/tuxbox/config/SoftCam.Key", "/usr/keys/SoftCam.Key"]
+CONFIG_DIRS = ["/etc/tuxbox/config/oscam", "/etc/tuxbox/config/ncam", "/etc/tuxbox/config", "/usr/keys"]
+INIT_SCRIPTS = ["/etc/init.d/softcam", "/etc/init.d/cardserver", "/etc/init.d/softcam.oscam", "/etc/init.d/softcam.ncam"]
+
+_key_path = None
+
+def get_softcam_path():
+    # The resolved path is kept while the file is still there, so repeated
+    # calls cost one stat instead of a walk over every candidate.
+    global _key_path
+    if _key_path and os.path.exists(_key_path): return _key_path
+    _key_path = None
+    for p in KEY_PATHS:
+        if os.path.exists(p):
+            _key_path = p; return p
+    return KEY_PATHS[0]
+
+def invalidate_softcam_path():
+    global _key_path
+    _key_path = None
+
+def restart_softcam_global():
+    os.system("killall -9 oscam ncam vicardd gbox 2>/dev/null")
+    invalidate_softcam_path()
+    time.sleep(1.2)
+    for s in INIT_SCRIPTS:
+        if os.path.exists(s):
+            os.system(f"'{s}' restart >/dev/null 2>&1")
+            break
+
+# ==========================================================
+# إعادة قراءة المفاتيح عبر واجهة الويب (OSCam / NCam)
+# ==========================================================
+def read_sections(path):
+    sections = []
+    try:
+        with open(path, "r", errors="replace") as f:
+            for line in f:
+                line = line.split("#", 1)[0].strip()
+                if line.startswith("[") and line.endswith("]"): sections.append((line[1:-1].strip().lower(), {}))
+                elif "=" in line and sections:
+                    k, v = line.split("=", 1); sections[-1][1][k.strip().lower()] = v.strip()
+    except (IOError, OSError): pass
+    return sections
+
+def find_webif(key_path=None):
+    dirs = ([os.path.dirname(key_path)] if key_path else []) + CONFIG_DIRS
+    for d in dirs:
+        for cam in ("oscam", "ncam"):
+            conf = os.path.join(d, cam + ".conf")
+            if not os.path.exists(conf): continue
+            webif = next((s for n, s in read_sections(conf) if n == "webif"), {})
+            port = webif.get("httpport", "").lstrip("+")
+            if not port.isdigit() or port == "0": continue
+            # Without an emu reader there is nothing to reread, so the caller
+            # falls back to restarting the cam.
+            label = next((s.get("label") for n, s in read_sections(os.path.join(d, cam + ".server")) if n == "reader" and s.get("protocol", "").lower() == "emu" and s.get("label")), None)
+            if label is None: continue
+            return {"url": f"{'https' if webif.get('httpport', '').startswith('+') else 'http'}://127.0.0.1:{port}", "user": webif.get("httpuser", ""), "pwd": webif.get("httppwd", ""), "label": label}
+    return None
+
+def webif_reread(webif, timeout=4):
+    from urllib.parse import quote
+    from urllib.request import build_opener, HTTPDigestAuthHandler, HTTPBasicAuthHandler, HTTPPasswordMgrWithDefaultRealm
+    handlers = []
+    if webif.get("user"):
+        mgr = HTTPPasswordMgrWithDefaultRealm(); mgr.add_password(None, webif["url"], webif["user"], webif["pwd"])
+        handlers = [HTTPDigestAuthHandler(mgr), HTTPBasicAuthHandler(mgr)]
+    url = f"{webif['url']}/readers.html?label={quote(webif['label'])}&action=reread"
+    with build_opener(*handlers).open(url, timeout=timeout) as r:
+        return r.getcode() == 200
+
+def reload_softcam(key_path=None):
+    webif = find_webif(key_path or get_softcam_path())
+    if webif:
+        try:
+            with diag.phase("softcam.reread"):
+                if webif_reread(webif): return "reread"
+        except Exception: pass
+    with diag.phase("softcam.restart"): restart_softcam_global()
+    return "restart"
+
+# ==========================================================
+# جدولة إعادة التحميل - دمج التعديلات المتتالية في تحميل واحد
+# ==========================================================
+class ReloadScheduler(object):
+    def __init__(self, delay=1.5, reload_func=reload_softcam):
+        self.delay = delay; self.reload_func = reload_func; self.listeners = []
+        self.lock = threading.Lock(); self._timer = None; self._pending = False; self._running = False
+
+    def schedule(self):
+        # Every call pushes the reload back by `delay`, so a burst of edits
+        # ends in a single reload once the user stops.
+        with self.lock:
+            self._pending = True
+            if self._timer: self._timer.cancel(); self._timer = None
+            if self._running: return
+            self._timer = threading.Timer(self.delay, self._run); self._timer.daemon = True; self._timer.start()
+
+    def cancel(self):
+        with self.lock:
+            self._pending = False
+            if self._timer: self._timer.cancel(); self._timer = None
+
+    def pending(self):
+        with self.lock: return self._pending or self._running
+
+    def _run(self):
+        with self.lock:
+            if self._running or not self._pending: return
+            self._running = True; self._pending = False; self._timer = None
+        try: method = self.reload_func()
+        except Exception: method = None
+        with self.lock:
+            self._running = False; again = self._pending; listeners = list(self.listeners)
+        for cb in listeners:
+            try: cb(method)
+            except Exception: pass
+        if again: self.schedule()
+
+reloader = ReloadScheduler()
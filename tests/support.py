@@ -0,0 +1,24 @@
+# -*- coding: utf-8 -*-
+# Shared setup: the repo is imported as the "BissPro" package against the
+# enigma2 stubs in benchmarks/stubs, exactly like the benchmarks do.
+import os, shutil, sys, tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+from bench_hotpaths import load_plugin, Session
+
+def plugin():
+    if "BissPro.plugin" not in sys.modules: load_plugin()
+    return sys.modules["BissPro.plugin"]
+
+class TempDir(object):
+    def setUp(self):
+        plugin(); self.dir = tempfile.mkdtemp(prefix="bisspro-test-")
+    def tearDown(self):
+        shutil.rmtree(self.dir, True)
+    def path(self, name): return os.path.join(self.dir, name)
+    def write(self, name, data):
+        with open(self.path(name), "wb") as f: f.write(data)
+        return self.path(name)
+    def read(self, name):
+        with open(self.path(name), "rb") as f: return f.read()
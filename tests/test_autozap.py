@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+import time, unittest
+from support import TempDir, plugin
+
+BISS = "11034 H 27500 Sport Feed 1 | KEY 1111111111111111\n"
+
+class Info(object):
+    def __init__(self, name, crypted, sid=0x0001, vpid=0x0100, freq=11034000):
+        self.values = {"sid": sid, "vpid": vpid, "crypted": crypted}; self.name = name; self.freq = freq
+    def getInfo(self, what):
+        from enigma import iServiceInformation as i
+        return {i.sSID: self.values["sid"], i.sVideoPID: self.values["vpid"], i.sIsCrypted: self.values["crypted"]}[what]
+    def getInfoObject(self, what): return {"frequency": self.freq, "polarization": 0, "symbol_rate": 27500000}
+    def getName(self): return self.name
+
+class Service(object):
+    def __init__(self, info): self._info = info
+    def info(self): return self._info
+
+class Nav(object):
+    def __init__(self): self.event = []; self.service = None
+    def getCurrentService(self): return self.service
+
+class Session(object):
+    def __init__(self): self.nav = Nav()
+
+class ZapWatcherTest(TempDir, unittest.TestCase):
+    def setUp(self):
+        TempDir.setUp(self)
+        from BissPro import softcam
+        self.plugin = plugin(); self.scheduled = []
+        self.orig = (self.plugin.get_softcam_path, softcam.reloader.schedule)
+        self.plugin.get_softcam_path = lambda: self.path("SoftCam.Key"); softcam.reloader.schedule = lambda: self.scheduled.append(1)
+
+    def tearDown(self):
+        from BissPro import softcam
+        self.plugin.get_softcam_path, softcam.reloader.schedule = self.orig
+        TempDir.tearDown(self)
+
+    def zap(self, info):
+        from BissPro.bissindex import BissIndex, parse_biss
+        from enigma import iPlayableService
+        index = BissIndex(path=self.path("biss.idx.json")); index._data = {"index": parse_biss(BISS), "checked": time.time()}
+        p = self.plugin; submitted = []; session = Session(); session.nav.service = Service(info)
+        orig = (p.get_biss_index, p.executor.submit, p.config.plugins.BissPro.autozap.value)
+        p.get_biss_index = lambda: index; p.executor.submit = lambda key, func, args=(), **kw: submitted.append((key, args))
+        p.config.plugins.BissPro.autozap.value = True
+        try: p.ZapWatcher(session).on_event(iPlayableService.evUpdatedInfo)
+        finally: p.get_biss_index, p.executor.submit, p.config.plugins.BissPro.autozap.value = orig
+        return [s for s in submitted if s[0] != "biss-load"]
+
+    def test_zap_applies_matching_feed(self):
+        self.assertEqual(self.zap(Info("Sport Feed 1", 1)), [(("autozap", "00010100"), ("00010100", "1111111111111111", "Sport Feed 1"))])
+
+    def test_free_to_air_service_is_left_alone(self):
+        self.assertEqual(self.zap(Info("Sport Feed 1", 0)), [])
+
+    def test_other_channel_on_listed_frequency_is_left_alone(self):
+        self.assertEqual(self.zap(Info("Al Jazeera", 1)), [])
+        self.assertEqual(self.zap(Info("Al Jazeera", 1, freq=11035000)), [])
+
+    def apply(self, key):
+        return self.plugin.ZapWatcher.apply_key(None, "00010100", key, "Feed")
+
+    def test_missing_key_is_added(self):
+        self.write("SoftCam.Key", b"")
+        self.assertTrue(self.apply("1111111111111111"))
+        self.assertEqual(self.read("SoftCam.Key"), b"F 00010100 00000000 1111111111111111 ;Feed\n")
+        self.assertEqual(self.scheduled, [1])
+
+    def test_existing_key_is_never_replaced(self):
+        data = b"F 00010100 00000000 2222222222222222 ;Entered by hand\n"
+        self.write("SoftCam.Key", data)
+        self.assertFalse(self.apply("1111111111111111"))
+        self.assertEqual(self.read("SoftCam.Key"), data)
+        self.assertEqual(self.scheduled, [])
+
+if __name__ == "__main__":
+    unittest.main()
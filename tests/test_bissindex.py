@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+import os, threading, time, unittest
+from support import TempDir, plugin
+
+TEXT = """11000 V 7200 My Feed | KEY 1111111111111111
+11002 V 27500 Some Other Channel
+BISS: 22 22 22 22 22 22 22 22
+# update: reported working
+11500.5 MHz H - 3333 News Feed
+  3333333333333333
+"""
+
+class BissIndexTest(TempDir, unittest.TestCase):
+    def index(self, text=TEXT):
+        from BissPro.bissindex import BissIndex, parse_biss
+        index = BissIndex(path=self.path("biss.idx.json")); index._data = {"index": parse_biss(text), "checked": time.time()}
+        return index
+
+    def test_parse_layouts(self):
+        from BissPro.bissindex import parse_biss
+        self.assertEqual(parse_biss(TEXT), {"11000": [["V", 7200, "My Feed", "1111111111111111"]], "11002": [["V", 27500, "Some Other Channel", "2222222222222222"]], "11500": [["H", 3333, "News Feed", "3333333333333333"]]})
+
+    def test_lookup_exact_and_nearby(self):
+        index = self.index()
+        self.assertEqual(index.lookup(11000, "V", 7200, "My Feed")[3], "1111111111111111")
+        self.assertEqual(index.lookup(11501, "H", 3333, "")[3], "3333333333333333")
+        self.assertIsNone(index.lookup(11500, "V", 3333, "News Feed"))
+
+    def test_lookup_rejects_weak_matches(self):
+        index = self.index("11002 V 27500 Some Other Channel | KEY 2222222222222222\n")
+        self.assertIsNone(index.lookup(11000, "V", 7200, "My Feed"))
+        self.assertIsNone(index.lookup(11002, "V", 7200, ""))
+        self.assertEqual(index.lookup(11002, "V", 27500, "")[3], "2222222222222222")
+
+    def test_strict_lookup_needs_the_name(self):
+        index = self.index("11034 H 27500 Sport Feed 1 | KEY 1111111111111111\n")
+        self.assertIsNotNone(index.lookup(11034, "H", 27500, "Al Jazeera"))
+        self.assertIsNone(index.lookup(11034, "H", 27500, "Al Jazeera", strict=True))
+        self.assertIsNone(index.lookup(11035, "H", 27500, "Al Jazeera", strict=True))
+        self.assertEqual(index.lookup(11035, "H", 27500, "sport feed 1", strict=True)[3], "1111111111111111")
+        self.assertEqual(index.lookup_many([(11034, "H", 27500, "Al Jazeera"), (11034, "H", 27500, "Sport Feed 1")], strict=True)[0], None)
+
+    def test_lookup_is_not_blocked_by_refresh_parse(self):
+        from BissPro import bissindex
+        index = self.index(); seen = []
+        def parse(text):
+            # A zap lookup on another thread while the new file is parsed.
+            t = threading.Thread(target=lambda: seen.append(index.lookup(11000, "V", 7200, "My Feed"))); t.start(); t.join(2)
+            return orig_parse(text)
+        orig = (bissindex.fetch, bissindex.parse_biss); orig_parse = orig[1]
+        bissindex.fetch = lambda url, etag, modified, timeout: (200, b"11000 V 7200 My Feed | KEY 9999999999999999\n", '"v2"', None)
+        bissindex.parse_biss = parse
+        try: self.assertTrue(index.refresh())
+        finally: bissindex.fetch, bissindex.parse_biss = orig
+        self.assertEqual(seen[0][3], "1111111111111111")
+        self.assertEqual(index.lookup(11000, "V", 7200, "My Feed")[3], "9999999999999999")
+
+    def test_not_modified_only_rewrites_the_state(self):
+        from BissPro import bissindex
+        index = bissindex.BissIndex(path=self.path("biss.idx.json")); sent = []; saved = []
+        replies = [(200, b"11000 V 7200 My Feed | KEY 9999999999999999\n", '"v1"', None), (304, b"", '"v1"', None)]
+        def fetch(url, etag, modified, timeout): sent.append(etag); return replies.pop(0)
+        orig = (bissindex.fetch, bissindex.save_json)
+        bissindex.fetch = fetch; bissindex.save_json = lambda path, data: (saved.append(os.path.basename(path)), orig[1](path, data))
+        try: self.assertEqual((index.refresh(), index.refresh()), (True, False))
+        finally: bissindex.fetch, bissindex.save_json = orig
+        self.assertEqual(sent, [None, '"v1"'])
+        self.assertEqual(saved, ["biss.idx.json", "biss.state.json", "biss.state.json"])
+        again = bissindex.BissIndex(path=self.path("biss.idx.json"))
+        self.assertEqual((again.lookup(11000, "V", 7200, "My Feed")[3], again.stale(bissindex.MISS_AGE)), ("9999999999999999", False))
+
+if __name__ == "__main__":
+    unittest.main()
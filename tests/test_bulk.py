@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+import time, unittest
+from support import TempDir, Session, plugin
+
+LAMEDB = """eDVB services /4/
+transponders
+00c00000:0001:0002
+\ts 11034000:27500000:0:0:130:2:0
+/
+end
+services
+0001:00c00000:0001:0002:1:0
+Sport Feed 1
+p:Feeds,c:000100,C:2600
+0002:00c00000:0001:0002:1:0
+Al Jazeera
+p:AJ,c:000200
+0003:00c00000:0001:0002:1:0
+Sport Feed 2
+p:Feeds,c:000300,C:2600
+0004:00c00000:0001:0002:1:0
+Other Channel
+p:Other,c:000400,C:0500
+end
+"""
+BISS = "11034 H 27500 Sport Feed 1 | KEY 1111111111111111\n11034 H 27500 Sport Feed 2 | KEY 2222222222222222\n"
+BOUQUET = "#NAME Test\n" + "".join(f"#SERVICE 1:0:1:{sid}:1:2:C00000:0:0:0:\n" for sid in (1, 2, 3, 4))
+MINE = b"F 00030300 00000000 9999999999999999 ;Mine\n"
+
+class BulkTest(TempDir, unittest.TestCase):
+    def setUp(self):
+        TempDir.setUp(self)
+        from BissPro import services, softcam
+        from BissPro.bissindex import BissIndex, parse_biss
+        self.plugin = p = plugin()
+        self.write("lamedb", LAMEDB.encode()); self.write("userbouquet.test.tv", BOUQUET.encode()); self.write("SoftCam.Key", MINE)
+        index = BissIndex(path=self.path("biss.idx.json")); index._data = {"index": parse_biss(BISS), "checked": time.time()}
+        self.orig = (services.E2_DIR, p.get_biss_index, p.get_softcam_path, softcam.reloader.schedule)
+        services.E2_DIR = self.dir + "/"; p.get_biss_index = lambda: index
+        p.get_softcam_path = lambda: self.path("SoftCam.Key"); softcam.reloader.schedule = lambda: None
+
+    def tearDown(self):
+        from BissPro import services, softcam
+        services.E2_DIR, self.plugin.get_biss_index, self.plugin.get_softcam_path, softcam.reloader.schedule = self.orig
+        TempDir.tearDown(self)
+
+    def test_bulk_fills_in_missing_keys_only(self):
+        screen = self.plugin.BISSPro(Session())
+        ok, msg = screen.do_bulk("userbouquet.test.tv", None); screen.close()
+        self.assertTrue(ok)
+        self.assertTrue(msg.startswith("Found 2 of 3 services, 1 new"), msg)
+        # Sport Feed 2 keeps the hand-entered key, Al Jazeera is free-to-air and
+        # Other Channel is on the listed frequency without a matching name.
+        self.assertEqual(self.read("SoftCam.Key"), MINE + b"F 00010100 00000000 1111111111111111 ;Sport Feed 1\n")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+import time, unittest
+from support import Session, plugin
+
+class FakeIndex(object):
+    def __init__(self, age=0): self.age = age; self.refreshed = 0
+    def lookup(self, *args): return None
+    def refresh(self): self.refreshed += 1; return False
+    def loaded(self): return True
+    def stale(self, max_age=6 * 3600): return self.age > max_age
+
+class DiagnosticsTest(unittest.TestCase):
+    def setUp(self):
+        plugin()
+        from BissPro.diag import Diagnostics
+        self.diag = Diagnostics()
+
+    def test_percentile(self):
+        from BissPro.diag import percentile
+        values = list(range(1, 101))
+        self.assertEqual((percentile(values, 50), percentile(values, 95), percentile([], 50)), (50, 95, 0.0))
+
+    def test_summary(self):
+        for ms in (10, 20, 30): self.diag.record("a", ms / 1000.0, 1024)
+        self.diag.record("a", 0.04, error="OSError")
+        self.assertEqual(self.diag.summary(), [("a", 4, 20.0, 40.0, 1, 3072)])
+
+    def test_phase_ignores_wall_clock_steps(self):
+        real = time.time
+        try:
+            with self.diag.phase("step"): time.time = lambda: real() - 3600
+        finally: time.time = real
+        self.assertGreaterEqual(self.diag.records[-1]["ms"], 0)
+        self.assertLess(self.diag.records[-1]["ms"], 1000)
+
+    def test_phase_records_exception_type(self):
+        with self.assertRaises(KeyError):
+            with self.diag.phase("fail"): raise KeyError("x")
+        self.assertEqual(self.diag.records[-1]["error"], "KeyError")
+
+    def test_auto_search_miss_is_not_an_error(self):
+        p = plugin(); from BissPro.diag import diag
+        orig = p.get_biss_index; p.get_biss_index = lambda: FakeIndex()
+        try:
+            screen = p.BISSPro(Session()); res = screen.do_auto("00010100", "Feed", 11000, "V", 7200); screen.close()
+        finally: p.get_biss_index = orig
+        self.assertEqual(res, (False, "No Key Found for Freq 11000"))
+        self.assertEqual((diag.records[-1]["phase"], diag.records[-1]["error"]), ("auto.total", None))
+
+    def test_auto_search_miss_refreshes_only_after_a_while(self):
+        p = plugin(); orig = p.get_biss_index; fresh = FakeIndex(60); old = FakeIndex(3600)
+        try:
+            for index in (fresh, old):
+                p.get_biss_index = lambda: index
+                screen = p.BISSPro(Session()); screen.do_auto("00010100", "Feed", 11000, "V", 7200); screen.close()
+        finally: p.get_biss_index = orig
+        self.assertEqual((fresh.refreshed, old.refreshed), (0, 1))
+
+if __name__ == "__main__":
+    unittest.main()
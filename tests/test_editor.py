@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+import threading, unittest
+from support import TempDir, Session, plugin
+from test_jobs import wait_for
+from test_autozap import Info, Service
+
+DUPES = b"F 00010100 00000000 1111111111111111 ;SatA\nF 00010100 00000000 2222222222222222 ;SatB\n"
+
+class EditorTest(TempDir, unittest.TestCase):
+    def setUp(self):
+        TempDir.setUp(self)
+        from BissPro import softcam
+        self.plugin = plugin(); self.key_path = self.write("SoftCam.Key", DUPES)
+        self.orig = (self.plugin.get_softcam_path, softcam.reloader.schedule)
+        self.plugin.get_softcam_path = lambda: self.key_path; softcam.reloader.schedule = lambda: None
+        self.screen = self.plugin.BissManagerList(Session()); self.screen.layoutFinished()
+        self.assertTrue(wait_for(self.plugin.executor, lambda: not self.screen.loading))
+
+    def tearDown(self):
+        from BissPro import softcam
+        self.screen.close(); self.plugin.get_softcam_path, softcam.reloader.schedule = self.orig
+        TempDir.tearDown(self)
+
+    def test_edit_duplicate_row(self):
+        self.screen["keylist"].moveToIndex(1); self.screen.edit_key(); self.screen.finish_edit("4444444444444444")
+        self.assertTrue(wait_for(self.plugin.executor, lambda: self.screen.rows[1].key == "4444444444444444"))
+        self.assertEqual(self.read("SoftCam.Key"), DUPES.replace(b"2222222222222222", b"4444444444444444"))
+        self.assertIs(self.screen["keylist"].list[1][1], self.screen.rows[1])
+
+    def test_delete_duplicate_row(self):
+        self.screen["keylist"].moveToIndex(1); self.screen.delete_key(True)
+        self.assertTrue(wait_for(self.plugin.executor, lambda: len(self.screen.rows) == 1))
+        self.assertEqual(self.read("SoftCam.Key"), DUPES.split(b"\n")[0] + b"\n")
+    def test_rows_are_shown_page_by_page(self):
+        p = self.plugin; screen = self.screen; screen.PAGE_SIZE = 1
+        self.write("SoftCam.Key", b"".join(b"F %08X 00000000 1111111111111111 ;Ch %d\n" % (n, n) for n in range(25)))
+        orig = p.executor.submit; jobs = []
+        p.executor.submit = lambda key, func, args=(), **kw: jobs.append((func, args))
+        try: screen.load_keys()
+        finally: p.executor.submit = orig
+        func, args = jobs[0]; func(*args); seen = []
+        while len(screen.rows) < 25: p.executor.drain(limit=1); seen.append((len(screen.rows), screen["info"].getText().endswith("...")))
+        self.assertEqual(seen, [(10, True), (20, True), (25, True)])
+        self.assertEqual(screen["keylist"].list[0][1].comment, "Ch 0")
+
+    def test_load_error_is_reported(self):
+        opened = []; self.screen.session.open = lambda *args, **kw: opened.append(args[1])
+        self.screen.keys_loaded(IOError("gone"))
+        self.assertEqual((opened, self.screen.loading), (["Could not read SoftCam.Key (OSError)"], False))
+
+class ManualSaveTest(TempDir, unittest.TestCase):
+    def setUp(self):
+        TempDir.setUp(self)
+        from BissPro import softcam
+        from BissPro.jobs import JobExecutor
+        self.plugin = p = plugin(); self.write("SoftCam.Key", b"")
+        self.orig = (p.get_softcam_path, softcam.reloader.schedule, p.executor)
+        p.get_softcam_path = lambda: self.path("SoftCam.Key"); softcam.reloader.schedule = lambda: None
+        p.executor = JobExecutor(workers=1)
+
+    def tearDown(self):
+        from BissPro import softcam
+        self.plugin.get_softcam_path, softcam.reloader.schedule, self.plugin.executor = self.orig
+        TempDir.tearDown(self)
+
+    def test_queued_saves_for_one_channel_all_run(self):
+        p = self.plugin; session = Session(); session.nav = type("Nav", (), {"getCurrentService": staticmethod(lambda: Service(Info("Feed", 1)))})
+        screen = p.BISSPro(session); gate = threading.Event(); results = []
+        p.executor.submit("busy", gate.wait, (5,))
+        screen.job_done = results.append
+        screen.manual_done("AAAAAAAAAAAAAAAA"); screen.manual_done("BBBBBBBBBBBBBBBB"); gate.set()
+        self.assertTrue(wait_for(p.executor, lambda: len(results) == 2))
+        self.assertEqual(results, [(True, "Saved: Feed"), (True, "Saved: Feed")])
+        self.assertEqual(self.read("SoftCam.Key"), b"F 00010100 00000000 BBBBBBBBBBBBBBBB ;Feed\n")
+
+if __name__ == "__main__":
+    unittest.main()
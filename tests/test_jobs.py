@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+import threading, time, unittest
+from support import plugin
+
+def wait_for(executor, cond, timeout=5):
+    end = time.time() + timeout
+    while not cond() and time.time() < end:
+        executor.drain(); time.sleep(0.005)
+    return cond()
+
+class Owner(dict): pass
+
+class JobExecutorTest(unittest.TestCase):
+    def setUp(self):
+        plugin()
+        from BissPro.jobs import JobExecutor
+        self.executor = JobExecutor()
+
+    def test_results_run_on_drain(self):
+        out = []; main = threading.current_thread()
+        self.executor.submit("a", lambda: 42, callback=lambda r: out.append((r, threading.current_thread() is main)))
+        self.assertTrue(wait_for(self.executor, lambda: out))
+        self.assertEqual(out, [(42, True)])
+
+    def test_same_key_is_shared(self):
+        gate = threading.Event(); calls = []; out = []
+        def work(): calls.append(1); gate.wait(5); return "done"
+        self.executor.submit("k", work, callback=out.append)
+        self.executor.submit("k", work, callback=out.append)
+        self.assertTrue(self.executor.busy("k")); gate.set()
+        self.assertTrue(wait_for(self.executor, lambda: len(out) == 2))
+        self.assertEqual((calls, out), ([1], ["done", "done"]))
+        self.assertFalse(self.executor.busy())
+
+    def test_exceptions_are_returned(self):
+        out = []
+        self.executor.submit("e", lambda: 1 // 0, callback=out.append)
+        self.assertTrue(wait_for(self.executor, lambda: out))
+        self.assertIsInstance(out[0], ZeroDivisionError)
+
+    def test_callback_errors_are_recorded(self):
+        from BissPro.diag import diag
+        out = []; diag.clear()
+        self.executor.post(None, lambda: 1 // 0)
+        self.executor.post(None, out.append, "next")
+        self.executor.drain()
+        self.assertEqual(out, ["next"])
+        self.assertEqual([(r["phase"], r["error"]) for r in diag.records], [("jobs.callback", "ZeroDivisionError")])
+
+    def test_cancel_drops_results_for_unhashable_owner(self):
+        owner = Owner(); other = []; gate = threading.Event(); out = []
+        self.executor.submit("slow", gate.wait, (5,), callback=out.append, owner=owner)
+        self.executor.post(owner, out.append, "posted")
+        self.executor.cancel(owner); gate.set()
+        self.executor.submit("other", lambda: "ok", callback=other.append)
+        self.assertTrue(wait_for(self.executor, lambda: other and not self.executor.busy()))
+        self.executor.drain()
+        self.assertEqual(out, [])
+
+    def test_cancel_keeps_queued_writes(self):
+        owner = Owner(); gate = threading.Event(); wrote = []; out = []
+        for i in range(self.executor.workers): self.executor.submit(("busy", i), gate.wait, (5,))
+        self.executor.submit(("save", "00010100", "11" * 8), wrote.append, ("key",), callback=out.append, owner=owner)
+        self.executor.submit("fetch", wrote.append, ("fetch",), callback=out.append, owner=owner)
+        self.executor.cancel(owner); gate.set()
+        self.assertTrue(wait_for(self.executor, lambda: not self.executor.busy()))
+        self.executor.drain()
+        self.assertEqual((wrote, out), (["key"], []))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+import os, unittest
+from support import TempDir, plugin
+
+DUPES = b"F 00010100 00000000 1111111111111111 ;SatA\nF 00010100 00000000 2222222222222222 ;SatB\nF 00020200 00000000 3333333333333333 ;Other\n"
+
+class KeyStoreTest(TempDir, unittest.TestCase):
+    def store(self, data, name="SoftCam.Key"):
+        from BissPro.keystore import KeyStore
+        return KeyStore(self.write(name, data))
+
+    def test_put_commit_round_trip(self):
+        store = self.store(b"# header\nF 00010100 00000000 1111111111111111 ;SatA\n")
+        self.assertTrue(store.put("F", "00030300", "00000000", "abcdefabcdefabcd", "New"))
+        self.assertFalse(store.put("F", "00010100", "00000000", "1111111111111111", "SatA"))
+        store.commit()
+        self.assertEqual(self.read("SoftCam.Key"), b"# header\nF 00010100 00000000 1111111111111111 ;SatA\nF 00030300 00000000 ABCDEFABCDEFABCD ;New\n")
+        self.assertEqual(self.store(self.read("SoftCam.Key")).get("F", "00030300", "00000000").key, "ABCDEFABCDEFABCD")
+
+    def test_duplicates_are_all_listed(self):
+        store = self.store(DUPES)
+        self.assertEqual([e.key for e in store.entries("F")], ["1111111111111111", "2222222222222222", "3333333333333333"])
+        self.assertEqual([e.comment for e in store.find("F", "00010100")], ["SatA", "SatB"])
+        self.assertEqual(store.get("F", "00010100", "00000000").comment, "SatA")
+
+    def test_update_entry_edits_its_own_line(self):
+        store = self.store(DUPES); second = store.entries("F")[1]
+        new = store.update_entry(second, "4444444444444444"); store.commit()
+        self.assertEqual(new.key, "4444444444444444")
+        self.assertEqual(self.read("SoftCam.Key"), DUPES.replace(b"2222222222222222", b"4444444444444444"))
+
+    def test_remove_entry_removes_its_own_line(self):
+        store = self.store(DUPES); second = store.entries("F")[1]
+        self.assertTrue(store.remove_entry(second)); store.commit()
+        self.assertEqual(self.read("SoftCam.Key"), DUPES.replace(b"F 00010100 00000000 2222222222222222 ;SatB\n", b""))
+        self.assertFalse(store.remove_entry(second))
+
+    def test_stale_entry_is_found_after_reparse(self):
+        store = self.store(DUPES); second = store.entries("F")[1]
+        self.write("SoftCam.Key", b"# moved\n" + DUPES); store.refresh(force=True)
+        store.update_entry(second, "5555555555555555"); store.commit()
+        self.assertIn(b"5555555555555555 ;SatB", self.read("SoftCam.Key"))
+        self.assertIn(b"1111111111111111 ;SatA", self.read("SoftCam.Key"))
+
+    def test_put_and_remove_ident_drop_every_duplicate(self):
+        store = self.store(DUPES)
+        store.remove_ident("F", "00010100", keep="00000000"); store.put("F", "00010100", "00000000", "6666666666666666", "Mine"); store.commit()
+        self.assertEqual(self.read("SoftCam.Key"), b"F 00010100 00000000 6666666666666666 ;Mine\nF 00020200 00000000 3333333333333333 ;Other\n")
+        store.remove_ident("F", "00010100"); store.commit()
+        self.assertEqual(store.find("F", "00010100"), [])
+
+    def test_crlf_is_preserved(self):
+        data = DUPES.replace(b"\n", b"\r\n")
+        store = self.store(data)
+        store.update_entry(store.entries("F")[0], "7777777777777777"); store.commit()
+        self.assertEqual(self.read("SoftCam.Key"), data.replace(b"1111111111111111", b"7777777777777777"))
+
+    def test_append_after_missing_final_newline(self):
+        store = self.store(b"F 00010100 00000000 1111111111111111")
+        store.put("F", "00020200", "00000000", "2222222222222222"); store.commit()
+        self.assertEqual(self.read("SoftCam.Key"), b"F 00010100 00000000 1111111111111111\nF 00020200 00000000 2222222222222222\n")
+
+    def test_same_length_edit_is_not_written_in_place(self):
+        from BissPro.diag import diag
+        store = self.store(DUPES); inode = os.stat(self.path("SoftCam.Key")).st_ino
+        store.update_entry(store.entries("F")[0], "8888888888888888"); store.commit()
+        self.assertEqual(diag.records[-1]["phase"], "keys.rewrite")
+        self.assertNotEqual(os.stat(self.path("SoftCam.Key")).st_ino, inode)
+        store.put("F", "00090900", "00000000", "9999999999999999"); store.commit()
+        self.assertEqual(diag.records[-1]["phase"], "keys.append")
+
+    def test_failed_commit_drops_pending_edits(self):
+        store = self.store(DUPES)
+        store.update_entry(store.entries("F")[0], "AAAAAAAAAAAAAAAA")
+        def fail(): raise OSError("disk full")
+        store._write_atomic = fail
+        self.assertRaises(OSError, store.commit)
+        del store._write_atomic
+        self.assertEqual(store.entries("F")[0].key, "1111111111111111")
+        self.assertFalse(store.commit())
+        self.assertEqual(self.read("SoftCam.Key"), DUPES)
+
+    def test_merge_keeps_duplicates_and_local_entries(self):
+        store = self.store(b"F 00010100 00000000 1111111111111111 ;SatA\nF 00050500 00000000 5555555555555555 ;Local\n")
+        remote = [b"F 00010100 00000000 1111111111111111 ;SatA\n", b"F 00010100 00000000 2222222222222222 ;SatB\n", b"F 00020200 00000000 3333333333333333 ;Other\n"]
+        self.assertEqual(store.merge(remote), 2); store.commit()
+        self.assertEqual([(e.ident, e.key) for e in store.entries("F")], [("00010100", "1111111111111111"), ("00050500", "5555555555555555"), ("00010100", "2222222222222222"), ("00020200", "3333333333333333")])
+        self.assertEqual(store.merge(remote), 0)
+
+    def test_merge_replaces_changed_key_and_keeps_name(self):
+        store = self.store(b"F 00010100 00000000 1111111111111111 ;My Name\n")
+        self.assertEqual(store.merge([b"F 00010100 00000000 2222222222222222\n"]), 1); store.commit()
+        self.assertEqual(self.read("SoftCam.Key"), b"F 00010100 00000000 2222222222222222 ;My Name\n")
+
+    def test_idle_store_drops_its_lines(self):
+        from BissPro import keystore
+        store = self.store(DUPES); store.put("F", "00030300", "00000000", "3333333333333333")
+        store.used -= keystore.IDLE_UNLOAD; store._expire()
+        self.assertEqual(len(store._lines), 4)
+        store.commit(); store.used -= keystore.IDLE_UNLOAD; store._expire()
+        self.assertEqual((store._lines, store._index), ([], {}))
+        self.assertEqual([e.comment for e in store.find("f", "00010100")], ["SatA", "SatB"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+import os, threading, unittest
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from support import TempDir, plugin
+
+REMOTE = b"F 00010100 00000000 1111111111111111 ;SatA\nF 00010100 00000000 2222222222222222 ;SatB\n"
+
+class KeyHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.server.requests.append(self.headers.get("If-None-Match"))
+        if self.headers.get("If-None-Match") == '"v1"':
+            self.send_response(304); self.end_headers(); return
+        self.send_response(200); self.send_header("ETag", '"v1"'); self.send_header("Content-Length", str(len(REMOTE))); self.end_headers()
+        self.wfile.write(REMOTE)
+    def log_message(self, *args): pass
+
+class KeyUpdateTest(TempDir, unittest.TestCase):
+    def setUp(self):
+        TempDir.setUp(self)
+        from BissPro import fetch
+        self.fetch = fetch; self.cache_dir = fetch.CACHE_DIR; fetch.CACHE_DIR = self.dir
+        self.server = HTTPServer(("127.0.0.1", 0), KeyHandler); self.server.requests = []
+        threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/softcam.key"
+
+    def tearDown(self):
+        self.fetch.CACHE_DIR = self.cache_dir
+        self.server.shutdown(); self.server.server_close(); TempDir.tearDown(self)
+
+    def update(self, target):
+        from BissPro.keyupdate import update_softcam
+        return update_softcam(target, url=self.url, timeout=5)
+
+    def test_first_install_then_not_modified(self):
+        from BissPro.keyupdate import UPDATED, UNCHANGED
+        target = self.path("oscam/SoftCam.Key")
+        self.assertEqual(self.update(target), (UPDATED, 2))
+        self.assertEqual(self.read("oscam/SoftCam.Key"), REMOTE)
+        self.assertEqual(self.update(target), (UNCHANGED, 0))
+        self.assertEqual(self.server.requests, [None, '"v1"'])
+
+    def test_missing_or_other_target_ignores_validators(self):
+        from BissPro.keyupdate import UPDATED
+        self.update(self.path("oscam/SoftCam.Key"))
+        os.remove(self.path("oscam/SoftCam.Key"))
+        self.assertEqual(self.update(self.path("oscam/SoftCam.Key")), (UPDATED, 2))
+        self.assertEqual(self.update(self.path("ncam/SoftCam.Key")), (UPDATED, 2))
+        self.write("ncam/SoftCam.Key", b"")
+        self.assertEqual(self.update(self.path("ncam/SoftCam.Key")), (UPDATED, 2))
+        self.assertEqual(self.server.requests, [None, None, None, None])
+
+    def test_merge_keeps_local_keys(self):
+        os.makedirs(self.path("oscam"))
+        self.write("oscam/SoftCam.Key", b"F 00090900 00000000 9999999999999999 ;Mine\n")
+        self.update(self.path("oscam/SoftCam.Key"))
+        self.assertEqual(self.read("oscam/SoftCam.Key"), b"F 00090900 00000000 9999999999999999 ;Mine\n" + REMOTE)
+
+if __name__ == "__main__":
+    unittest.main()
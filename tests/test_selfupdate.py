@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+import functools, importlib.util, os, shutil, sys, threading, unittest
+from http.server import HTTPServer, SimpleHTTPRequestHandler
+from support import ROOT, TempDir, plugin
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, *args): pass
+
+def load_package(name, folder):
+    spec = importlib.util.spec_from_file_location(name, os.path.join(folder, "__init__.py"), submodule_search_locations=[folder])
+    pkg = importlib.util.module_from_spec(spec); sys.modules[name] = pkg; spec.loader.exec_module(pkg)
+    return importlib.import_module(name + ".plugin")
+
+class VersionTest(unittest.TestCase):
+    def setUp(self): plugin()
+
+    def test_is_newer(self):
+        from BissPro.selfupdate import is_newer, parse_version
+        self.assertEqual(parse_version("v1.10"), (1, 10))
+        self.assertTrue(is_newer("1.10", "v1.9"))
+        self.assertFalse(is_newer("1.0", "v1.0"))
+        self.assertFalse(is_newer("", "v1.0"))
+
+    def test_parse_sums(self):
+        from BissPro.selfupdate import parse_sums
+        self.assertEqual(parse_sums("%s  plugin.py\n%s *jobs.py\nbad line\n" % ("a" * 64, "B" * 64)), {"plugin.py": "a" * 64, "jobs.py": "b" * 64})
+
+class UpdateTest(TempDir, unittest.TestCase):
+    # The repo root is served as the update source, so SHA256SUMS has to match the tree.
+    def setUp(self):
+        TempDir.setUp(self)
+        self.server = HTTPServer(("127.0.0.1", 0), functools.partial(QuietHandler, directory=ROOT))
+        threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True).start()
+        self.base = f"http://127.0.0.1:{self.server.server_address[1]}/"
+
+    def tearDown(self):
+        self.server.shutdown(); self.server.server_close(); TempDir.tearDown(self)
+
+    def test_install_update(self):
+        from BissPro.selfupdate import install_update
+        names = sorted(n for n in os.listdir(ROOT) if n.endswith(".py"))
+        self.assertEqual(install_update(self.dir, base=self.base, timeout=5), len(names))
+        self.assertEqual(sorted(os.listdir(self.dir)), names)
+
+    def test_plugin_alone_can_fetch_its_modules(self):
+        # A v1.0 box replaces only plugin.py when it updates.
+        for name in ("__init__.py", "plugin.py"): shutil.copy(os.path.join(ROOT, name), self.path(name))
+        old = load_package("BissProPartial", self.dir)
+        self.assertTrue(old.MISSING)
+        self.assertEqual(old.sessionstart(0, session=object()), None)
+        self.assertGreater(old.repair_modules(self.dir, base=self.base, timeout=5), 0)
+        self.assertIsNone(load_package("BissProRepaired", self.dir).MISSING)
+
+if __name__ == "__main__":
+    unittest.main()
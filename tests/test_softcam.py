@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+import base64, threading, time, unittest
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from support import TempDir, plugin
+
+class WebifHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        srv = self.server
+        if srv.auth and self.headers.get("Authorization") != "Basic " + base64.b64encode(srv.auth.encode()).decode():
+            self.send_response(401); self.send_header("WWW-Authenticate", 'Basic realm="Forbidden"'); self.end_headers(); return
+        srv.paths.append(self.path)
+        self.send_response(srv.status); self.send_header("Content-Length", "0"); self.end_headers()
+    def log_message(self, *args): pass
+
+class SoftcamTest(TempDir, unittest.TestCase):
+    def setUp(self):
+        TempDir.setUp(self)
+        from BissPro import softcam
+        self.softcam = softcam; self.restarts = []
+        self.server = HTTPServer(("127.0.0.1", 0), WebifHandler); self.server.status = 200; self.server.auth = None; self.server.paths = []
+        threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True).start()
+        self.orig_restart = softcam.restart_softcam_global; softcam.restart_softcam_global = lambda: self.restarts.append(1)
+
+    def tearDown(self):
+        self.softcam.restart_softcam_global = self.orig_restart
+        self.server.shutdown(); self.server.server_close(); TempDir.tearDown(self)
+
+    def configure(self, user=""):
+        port = self.server.server_address[1]
+        auth = f"httpuser = {user.split(':')[0]}\nhttppwd = {user.split(':')[1]}\n" if user else ""
+        self.write("oscam.conf", f"[global]\nlogfile = /tmp/oscam.log\n\n[webif]\nhttpport = {port}\n{auth}".encode())
+        self.write("oscam.server", b"[reader]\nlabel = my emu\nprotocol = emu\n")
+        return self.write("SoftCam.Key", b"")
+
+    def test_find_webif(self):
+        key = self.configure("admin:secret")
+        webif = self.softcam.find_webif(key)
+        self.assertEqual(webif, {"url": f"http://127.0.0.1:{self.server.server_address[1]}", "user": "admin", "pwd": "secret", "label": "my emu"})
+
+    def test_reread_through_webif(self):
+        self.assertEqual(self.softcam.reload_softcam(self.configure()), "reread")
+        self.assertEqual(self.server.paths, ["/readers.html?label=my%20emu&action=reread"])
+        self.assertEqual(self.restarts, [])
+
+    def test_reread_with_basic_auth(self):
+        self.server.auth = "admin:secret"
+        self.assertEqual(self.softcam.reload_softcam(self.configure("admin:secret")), "reread")
+        self.assertEqual(len(self.server.paths), 1)
+
+    def test_falls_back_to_restart_on_error(self):
+        self.server.status = 500
+        self.assertEqual(self.softcam.reload_softcam(self.configure()), "restart")
+        self.assertEqual(self.restarts, [1])
+
+    def test_falls_back_to_restart_without_webif(self):
+        self.assertEqual(self.softcam.reload_softcam(self.write("SoftCam.Key", b"")), "restart")
+        self.assertEqual(self.restarts, [1])
+
+    def test_falls_back_to_restart_without_emu_reader(self):
+        key = self.configure(); self.write("oscam.server", b"[reader]\nlabel = card\nprotocol = internal\n")
+        self.assertIsNone(self.softcam.find_webif(key))
+        self.assertEqual(self.softcam.reload_softcam(key), "restart")
+        self.assertEqual((self.server.paths, self.restarts), ([], [1]))
+
+    def test_scheduler_coalesces_bursts(self):
+        calls = []; done = threading.Event()
+        sched = self.softcam.ReloadScheduler(delay=0.05, reload_func=lambda: calls.append(1) or "reread")
+        sched.listeners.append(lambda method: done.set())
+        for i in range(5): sched.schedule()
+        self.assertTrue(done.wait(2)); time.sleep(0.1)
+        self.assertEqual(calls, [1]); self.assertFalse(sched.pending())
+
+if __name__ == "__main__":
+    unittest.main()